@@ -1,29 +1,50 @@
 from flask import Flask, redirect
 from flask_sqlalchemy import SQLAlchemy
 from flask_migrate import Migrate
+from sqlalchemy import BigInteger
+from sqlalchemy.ext.compiler import compiles
 from app.config import Config
+from app.dbrouting import RoutingSession
 try:
     from flask_cors import CORS
 except Exception:
     CORS = None
 
-db = SQLAlchemy()
+@compiles(BigInteger, 'sqlite')
+def _sqlite_big_integer(type_, compiler, **kw):
+    # SQLite only autoincrements INTEGER PRIMARY KEY columns
+    return 'INTEGER'
+
+db = SQLAlchemy(session_options={'class_': RoutingSession})
 migrate = Migrate()
 
 def create_app():
     app = Flask(__name__)
     app.config.from_object(Config())
     if CORS:
-        CORS(app, resources={r"/*": {"origins": "*"}})
+        CORS(app, resources={r"/*": {"origins": "*"}}, expose_headers=["Server-Timing", "X-Query-Count", "X-Request-ID"])
+    from app import dbpool, logger
+    logger.init_app(app)
+    dbpool.init_app(app)
     db.init_app(app)
     migrate.init_app(app, db)
+    from app import auth, cache, metrics, passwords, querystats, ratelimit
+    metrics.init_app(app)
+    querystats.init_app(app)
+    cache.init_app(app)
+    auth.init_app(app)
+    passwords.init_app(app)
+    ratelimit.init_app(app)
     from app.models.user import User
     from app.models.product import Product
     from app.models.stock import Stock
-    from app.models.transaction import Transaction, TransactionItem
+    from app.models.transaction import Transaction, TransactionItem, ArchivedTransaction, ArchivedTransactionItem
     from app.models.cart import Cart, CartItem
+    from app.models.stock_movement import StockMovement, StockSnapshot
+    from app.models.sales_rollup import DailySales, DailyProductSales, DailyCategorySales
     from app.routes import bp
     app.register_blueprint(bp, url_prefix='/api')
+    dbpool.warm_up(app)
 
     @app.route('/')
     def root_redirect():
@@ -0,0 +1,109 @@
+"""Move finished orders out of the live order tables.
+
+Completed and cancelled orders older than a cutoff are copied into
+transactions_archive / transaction_items_archive and deleted from the live
+tables. Each batch is one database transaction, so an order is always in
+exactly one place. Ids are kept, so detail links keep working.
+
+That relies on the live tables never handing out an archived id again. Both
+use AUTOINCREMENT on SQLite, and migration 3f7b2c9d1a64 moves MySQL's
+AUTO_INCREMENT past the archive. MySQL before 8.0 resets the counter to
+MAX(id) + 1 on restart, so the newest order and the order owning the newest
+line always stay live. A collision that slips through anyway stops the batch
+with ArchiveCollision instead of overwriting or duplicating an order.
+
+History reads (a customer's orders and totals, order detail, analytics,
+exports and the rollup rebuild) see both tables through union_all(). The admin
+order list and the status and delete endpoints work on live orders only.
+"""
+import time
+from datetime import datetime
+from app import db
+from app.models.transaction import Transaction, TransactionItem, ArchivedTransaction, ArchivedTransactionItem
+
+ARCHIVABLE_STATUSES = ('completed', 'cancelled')
+# (orders, lines) table pairs, live first
+PAIRS = ((Transaction, TransactionItem), (ArchivedTransaction, ArchivedTransactionItem))
+
+class ArchiveCollision(RuntimeError):
+    """A live id is already taken in the archive"""
+
+def union_all(build):
+    """build(orders_model, lines_model) run against both pairs, as one subquery"""
+    return db.union_all(*(build(T, I) for T, I in PAIRS)).subquery()
+
+def _archivable(cutoff):
+    newest_order = db.select(db.func.max(Transaction.id)).scalar_subquery()
+    newest_line_owner = db.select(TransactionItem.transaction_id).where(
+        TransactionItem.id == db.select(db.func.max(TransactionItem.id)).scalar_subquery()
+    ).scalar_subquery()
+    return (
+        Transaction.status.in_(ARCHIVABLE_STATUSES),
+        Transaction.created_at < cutoff,
+        # keeps MAX(id) of both live tables where a counter reset would find it
+        Transaction.id != newest_order,
+        Transaction.id != db.func.coalesce(newest_line_owner, 0)
+    )
+
+def pending_count(cutoff):
+    return db.session.query(db.func.count(Transaction.id)).filter(*_archivable(cutoff)).scalar()
+
+def _copy(source, target, where):
+    taken = db.session.execute(
+        db.select(target.id).where(target.id.in_(db.select(source.id).where(where))).limit(10)
+    ).scalars().all()
+    if taken:
+        raise ArchiveCollision(
+            f"{source.__tablename__} ids {', '.join(map(str, taken))} already exist in "
+            f"{target.__tablename__}; the live id sequence has gone back below archived ids"
+        )
+    columns = [c.name for c in source.__table__.columns]
+    select = db.select(*(source.__table__.c[name] for name in columns))
+    if 'archived_at' in target.__table__.c:
+        columns.append('archived_at')
+        select = select.add_columns(db.literal(datetime.utcnow(), db.DateTime))
+    db.session.execute(db.insert(target).from_select(columns, select.where(where)))
+
+def _supports_skip_locked():
+    # MySQL gained SKIP LOCKED in 8.0 and MariaDB in 10.6; older servers reject it
+    dialect = db.session.connection().dialect
+    if dialect.name != 'mysql':
+        return True
+    return (dialect.server_version_info or ()) >= ((10, 6) if dialect.is_mariadb else (8, 0))
+
+def archive_batch(cutoff, batch_size):
+    """Archive up to batch_size orders, oldest first; returns how many moved"""
+    ids = db.session.execute(
+        db.select(Transaction.id).where(*_archivable(cutoff))
+        .order_by(Transaction.created_at, Transaction.id).limit(batch_size)
+        # where possible, orders an admin is editing right now wait for the next run;
+        # elsewhere the batch waits for those row locks instead
+        .with_for_update(skip_locked=_supports_skip_locked())
+    ).scalars().all()
+    if not ids:
+        db.session.rollback()
+        return 0
+    try:
+        _copy(Transaction, ArchivedTransaction, Transaction.id.in_(ids))
+        _copy(TransactionItem, ArchivedTransactionItem, TransactionItem.transaction_id.in_(ids))
+        db.session.execute(db.delete(TransactionItem).where(TransactionItem.transaction_id.in_(ids)))
+        db.session.execute(db.delete(Transaction).where(Transaction.id.in_(ids)))
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+    return len(ids)
+
+def archive(cutoff, batch_size=1000, pause=0.0, progress=None):
+    """Archive every eligible order created before cutoff; returns the total moved"""
+    total = 0
+    while True:
+        moved = archive_batch(cutoff, batch_size)
+        total += moved
+        if progress:
+            progress(total)
+        if moved < batch_size:
+            return total
+        if pause:
+            # leave room for live traffic between batches
+            time.sleep(pause)
@@ -0,0 +1,172 @@
+import base64
+import hashlib
+import hmac
+import json
+import logging
+import secrets
+import time
+from collections import namedtuple
+from functools import wraps
+from flask import current_app, g, jsonify, request
+from app import db
+from app.cache import TTLCache
+
+Principal = namedtuple('Principal', ['id', 'username', 'email', 'is_admin'])
+
+TOKEN_VERSION = 'v1'
+# SECRET_KEY's default; also committed in .env, so never good enough to sign tokens
+_PUBLIC_SECRETS = ('secret-key',)
+
+logger = logging.getLogger(__name__)
+
+# id -> Principal for legacy X-User-ID callers; dropped by UserController.update/delete
+_principal_cache = TTLCache(maxsize=1024, ttl=60, name='principals')
+
+def init_app(app):
+    _principal_cache.configure(
+        maxsize=app.config.get('PRINCIPAL_CACHE_SIZE', 1024),
+        ttl=app.config.get('PRINCIPAL_CACHE_TTL', 60)
+    )
+    _check_token_keys(app)
+
+def _check_token_keys(app):
+    """Refuse to sign tokens with a missing or publicly known key"""
+    keys = app.config.get('AUTH_TOKEN_KEYS') or []
+    public = set(_PUBLIC_SECRETS) | {app.config.get('SECRET_KEY')}
+    weak = [kid for kid, secret in keys if secret in public]
+    if keys and not weak:
+        return
+    if not (app.debug or app.testing):
+        if weak:
+            raise RuntimeError(f"AUTH_TOKEN_KEYS key(s) {', '.join(weak)} reuse SECRET_KEY or its default; set a private secret")
+        raise RuntimeError('AUTH_TOKEN_KEYS is not set; bearer tokens need a private signing key ("kid:secret")')
+    if weak:
+        logger.warning('AUTH_TOKEN_KEYS reuses SECRET_KEY or its default; only acceptable for local runs')
+    else:
+        # tokens from this key die with the process, which is fine for local runs
+        app.config['AUTH_TOKEN_KEYS'] = [('dev', secrets.token_urlsafe(32))]
+        logger.warning('AUTH_TOKEN_KEYS is not set; signing tokens with a throwaway key')
+
+def _b64encode(raw):
+    return base64.urlsafe_b64encode(raw).rstrip(b'=').decode('ascii')
+
+def _b64decode(text):
+    return base64.urlsafe_b64decode(text + '=' * (-len(text) % 4))
+
+def _sign(secret, signing_input):
+    return hmac.new(secret.encode('utf-8'), signing_input.encode('ascii'), hashlib.sha256).digest()
+
+def issue_token(user, ttl=None):
+    """Create a signed, expiring bearer token carrying the user's id and role"""
+    kid, secret = current_app.config['AUTH_TOKEN_KEYS'][0]
+    now = int(time.time())
+    claims = {
+        'sub': user.id,
+        'usr': user.username,
+        'eml': user.email,
+        'adm': bool(user.is_admin),
+        'iat': now,
+        'exp': now + (ttl or current_app.config['AUTH_TOKEN_TTL'])
+    }
+    payload = _b64encode(json.dumps(claims, separators=(',', ':')).encode('utf-8'))
+    signing_input = f"{TOKEN_VERSION}.{kid}.{payload}"
+    return f"{signing_input}.{_b64encode(_sign(secret, signing_input))}"
+
+def verify_token(token):
+    """Return the Principal for a valid token, None otherwise. Never touches the DB."""
+    try:
+        version, kid, payload, signature = token.split('.')
+    except ValueError:
+        return None
+    if version != TOKEN_VERSION:
+        return None
+    secret = dict(current_app.config['AUTH_TOKEN_KEYS']).get(kid)
+    if secret is None:
+        return None
+    try:
+        expected = _sign(secret, f"{version}.{kid}.{payload}")
+        if not hmac.compare_digest(expected, _b64decode(signature)):
+            return None
+        claims = json.loads(_b64decode(payload))
+    except (ValueError, TypeError):
+        return None
+    if claims.get('exp', 0) < time.time():
+        return None
+    return Principal(int(claims['sub']), claims.get('usr'), claims.get('eml'), bool(claims.get('adm')))
+
+def invalidate_principal(user_id):
+    _principal_cache.pop(int(user_id))
+
+def _fetch_principal(user_id):
+    principal = _principal_cache.get(user_id)
+    if principal is not None:
+        return principal
+    from app.models.user import User
+    row = db.session.query(
+        User.id, User.username, User.email, User.is_admin
+    ).filter(User.id == user_id).first()
+    if row is None:
+        return None
+    principal = Principal(row.id, row.username, row.email, bool(row.is_admin))
+    _principal_cache.set(user_id, principal)
+    return principal
+
+def load_principal():
+    """before_request hook: resolve the caller once per request into g.principal"""
+    g.principal = None
+    g.auth_attempted = False
+    authorization = request.headers.get('Authorization', '')
+    if authorization.startswith('Bearer '):
+        g.auth_attempted = True
+        g.principal = verify_token(authorization[len('Bearer '):].strip())
+        return
+    user_id = request.headers.get('X-User-ID')
+    if not user_id or not current_app.config.get('AUTH_ALLOW_USER_ID_HEADER'):
+        return
+    g.auth_attempted = True
+    try:
+        g.principal = _fetch_principal(int(user_id))
+    except ValueError:
+        g.principal = None
+
+def current_user_id():
+    principal = g.get('principal')
+    return principal.id if principal else None
+
+def _auth_error():
+    if not g.get('auth_attempted'):
+        return jsonify({
+            'status': 'error',
+            'message': 'Authentication required'
+        }), 401
+    if request.headers.get('Authorization', '').startswith('Bearer '):
+        return jsonify({
+            'status': 'error',
+            'message': 'Invalid or expired token'
+        }), 401
+    return jsonify({
+        'status': 'error',
+        'message': 'Invalid user'
+    }), 401
+
+def login_required(view):
+    @wraps(view)
+    def wrapped(*args, **kwargs):
+        if g.get('principal') is None:
+            return _auth_error()
+        return view(*args, **kwargs)
+    return wrapped
+
+def admin_required(view):
+    @wraps(view)
+    def wrapped(*args, **kwargs):
+        principal = g.get('principal')
+        if principal is None:
+            return _auth_error()
+        if not principal.is_admin:
+            return jsonify({
+                'status': 'error',
+                'message': 'Admin access required'
+            }), 403
+        return view(*args, **kwargs)
+    return wrapped
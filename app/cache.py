@@ -0,0 +1,95 @@
+import threading
+import time
+from collections import OrderedDict
+
+_MISSING = object()
+
+# cache name -> callable returning {'hits', 'misses', 'entries'}, read by app.metrics
+registry = {}
+
+class TTLCache:
+    """Thread-safe LRU cache whose entries also expire after `ttl` seconds.
+
+    Named caches report hits, misses and size through `registry`.
+    """
+
+    def __init__(self, maxsize=1024, ttl=60, name=None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.name = name
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        if name:
+            registry[name] = self.stats
+
+    def configure(self, maxsize=None, ttl=None):
+        with self._lock:
+            if maxsize is not None:
+                self.maxsize = maxsize
+            if ttl is not None:
+                self.ttl = ttl
+            self._data.clear()
+
+    def get(self, key, default=None):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+            if entry is _MISSING:
+                self.misses += 1
+                return default
+            expires, value = entry
+            if expires <= now:
+                del self._data[key]
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key, value, ttl=None):
+        expires = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._data[key] = (expires, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def pop(self, key):
+        with self._lock:
+            entry = self._data.pop(key, None)
+        return entry[1] if entry else None
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+    def stats(self):
+        return {'hits': self.hits, 'misses': self.misses, 'entries': len(self._data)}
+
+def on_commit(callback, *args):
+    """Run callback(*args) once the current session commits; dropped on rollback.
+
+    Used to invalidate caches only after the write they depend on is visible.
+    """
+    from app import db
+    db.session.info.setdefault('on_commit', {})[(callback, args)] = True
+
+def _run_commit_hooks(session):
+    hooks = session.info.pop('on_commit', None)
+    for callback, args in hooks or ():
+        callback(*args)
+
+def _drop_commit_hooks(session):
+    session.info.pop('on_commit', None)
+
+def init_app(app):
+    from sqlalchemy import event
+    from app import db
+    if not event.contains(db.session, 'after_commit', _run_commit_hooks):
+        event.listen(db.session, 'after_commit', _run_commit_hooks)
+        event.listen(db.session, 'after_rollback', _drop_commit_hooks)
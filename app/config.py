@@ -1,11 +1,86 @@
 import os
 basedir = os.path.abspath(os.path.dirname(__file__))
 
+def _token_keys(raw):
+    # "kid:secret,kid:secret"; the first key signs, all of them verify
+    keys = []
+    for part in (raw or '').split(','):
+        kid, sep, secret = part.strip().partition(':')
+        if sep and kid and secret:
+            keys.append((kid, secret))
+    return keys
+
+def _replica_binds(raw):
+    # "uri,uri" -> {'replica_0': uri, 'replica_1': uri}; app/dbrouting.py routes reads to them
+    uris = [uri.strip() for uri in (raw or '').split(',') if uri.strip()]
+    return {f'replica_{i}': uri for i, uri in enumerate(uris)}
+
 class Config:
     HOST = str(os.environ.get("DB_HOST", "localhost"))
     DATABASE = str(os.environ.get("DB_DATABASE", "ecommerce_kopi"))
     USERNAME = str(os.environ.get("DB_USERNAME", "root"))
     PASSWORD = str(os.environ.get("DB_PASSWORD", ""))
     SECRET_KEY = str(os.environ.get("SECRET_KEY", "secret-key"))
-    SQLALCHEMY_DATABASE_URI = f"mysql+pymysql://{USERNAME}:{PASSWORD}@{HOST}/{DATABASE}"
-    SQLALCHEMY_TRACK_MODIFICATIONS = False
\ No newline at end of file
+    # DATABASE_URL takes precedence, e.g. sqlite:///primary.db for local runs
+    SQLALCHEMY_DATABASE_URI = os.environ.get("DATABASE_URL") or f"mysql+pymysql://{USERNAME}:{PASSWORD}@{HOST}/{DATABASE}"
+    # read replicas, comma separated; see app/dbrouting.py
+    SQLALCHEMY_BINDS = _replica_binds(os.environ.get("DB_REPLICA_URIS"))
+    DB_REPLICA_STICKY_SECONDS = float(os.environ.get("DB_REPLICA_STICKY_SECONDS", 5))
+    SQLALCHEMY_TRACK_MODIFICATIONS = False
+    # connection pool (ignored for SQLite); see app/dbpool.py
+    DB_POOL_SIZE = int(os.environ.get("DB_POOL_SIZE", 10))
+    DB_MAX_OVERFLOW = int(os.environ.get("DB_MAX_OVERFLOW", 20))
+    DB_POOL_TIMEOUT = float(os.environ.get("DB_POOL_TIMEOUT", 10))
+    # below MySQL's wait_timeout so idle connections are replaced before the server drops them
+    DB_POOL_RECYCLE = int(os.environ.get("DB_POOL_RECYCLE", 1800))
+    DB_POOL_PRE_PING = os.environ.get("DB_POOL_PRE_PING", "1").lower() in ("1", "true", "yes")
+    DB_POOL_WARMUP = int(os.environ.get("DB_POOL_WARMUP", 0))
+    # per-request SQL stats; see app/querystats.py
+    QUERY_STATS_ENABLED = os.environ.get("QUERY_STATS_ENABLED", "1").lower() in ("1", "true", "yes")
+    NPLUSONE_THRESHOLD = int(os.environ.get("NPLUSONE_THRESHOLD", 10))
+    NPLUSONE_STRICT = os.environ.get("NPLUSONE_STRICT", "0").lower() in ("1", "true", "yes")
+    # structured logging; see app/logger.py
+    LOG_LEVEL = str(os.environ.get("LOG_LEVEL", "INFO")).upper()
+    LOG_FORMAT = str(os.environ.get("LOG_FORMAT", "json"))
+    # share of INFO records (the access log, mostly) that are kept; warnings and errors always are
+    LOG_INFO_SAMPLE_RATE = float(os.environ.get("LOG_INFO_SAMPLE_RATE", 1.0))
+    LOG_ACCESS = os.environ.get("LOG_ACCESS", "1").lower() in ("1", "true", "yes")
+    LOG_QUEUE_SIZE = int(os.environ.get("LOG_QUEUE_SIZE", 10000))
+    # readiness probe; see app/health.py
+    HEALTH_PROBE_TIMEOUT = float(os.environ.get("HEALTH_PROBE_TIMEOUT", 1))
+    HEALTH_CACHE_SECONDS = float(os.environ.get("HEALTH_CACHE_SECONDS", 2))
+    # /metrics; see app/metrics.py
+    METRICS_ENABLED = os.environ.get("METRICS_ENABLED", "1").lower() in ("1", "true", "yes")
+    METRICS_DIR = os.environ.get("METRICS_DIR") or None
+    METRICS_FLUSH_INTERVAL = float(os.environ.get("METRICS_FLUSH_INTERVAL", 5))
+    PRINCIPAL_CACHE_SIZE = int(os.environ.get("PRINCIPAL_CACHE_SIZE", 1024))
+    PRINCIPAL_CACHE_TTL = int(os.environ.get("PRINCIPAL_CACHE_TTL", 60))
+    # required outside debug/testing; app/auth.py refuses to start without it
+    AUTH_TOKEN_KEYS = _token_keys(os.environ.get("AUTH_TOKEN_KEYS"))
+    AUTH_TOKEN_TTL = int(os.environ.get("AUTH_TOKEN_TTL", 8 * 3600))
+    # Only for clients that have not moved to bearer tokens yet
+    AUTH_ALLOW_USER_ID_HEADER = os.environ.get("AUTH_ALLOW_USER_ID_HEADER", "0") == "1"
+    # werkzeug method string, cost included: "scrypt:32768:8:1", "pbkdf2:sha256:600000"
+    PASSWORD_HASH_METHOD = str(os.environ.get("PASSWORD_HASH_METHOD", "scrypt:32768:8:1"))
+    PASSWORD_HASH_WORKERS = int(os.environ.get("PASSWORD_HASH_WORKERS", 2))
+    PASSWORD_HASH_QUEUE = int(os.environ.get("PASSWORD_HASH_QUEUE", 32))
+    PASSWORD_HASH_TIMEOUT = float(os.environ.get("PASSWORD_HASH_TIMEOUT", 10))
+    RATELIMIT_ENABLED = os.environ.get("RATELIMIT_ENABLED", "1").lower() in ("1", "true", "yes")
+    # "memory" (per process) or "sqlite:///path" (shared by the workers on a host)
+    RATELIMIT_STORAGE = str(os.environ.get("RATELIMIT_STORAGE", "memory"))
+    # burst/seconds: "10/60" allows 10 at once, refilled at 10 per minute
+    RATELIMITS = {
+        'login': os.environ.get("RATELIMIT_LOGIN", "10/60"),
+        'register': os.environ.get("RATELIMIT_REGISTER", "5/300"),
+        'checkout': os.environ.get("RATELIMIT_CHECKOUT", "10/60"),
+    }
+    DASHBOARD_CACHE_TTL = float(os.environ.get("DASHBOARD_CACHE_TTL", 30))
+    DASHBOARD_REFRESH_AFTER = float(os.environ.get("DASHBOARD_REFRESH_AFTER", 10))
+    CUSTOMER_DASHBOARD_CACHE_TTL = float(os.environ.get("CUSTOMER_DASHBOARD_CACHE_TTL", 60))
+    TRANSACTION_DETAIL_CACHE_TTL = float(os.environ.get("TRANSACTION_DETAIL_CACHE_TTL", 600))
+    ANALYTICS_CACHE_TTL = float(os.environ.get("ANALYTICS_CACHE_TTL", 300))
+    ANALYTICS_BATCH_SIZE = int(os.environ.get("ANALYTICS_BATCH_SIZE", 10000))
+    EXPORT_BATCH_SIZE = int(os.environ.get("EXPORT_BATCH_SIZE", 5000))
+    # order archival; see app/archive.py and scripts/archive_transactions.py
+    ARCHIVE_AFTER_DAYS = int(os.environ.get("ARCHIVE_AFTER_DAYS", 365))
+    ARCHIVE_BATCH_SIZE = int(os.environ.get("ARCHIVE_BATCH_SIZE", 1000))
\ No newline at end of file
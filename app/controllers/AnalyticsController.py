@@ -0,0 +1,265 @@
+from app.models.product import Product
+from app.cache import TTLCache
+from app.params import parse_datetime
+from app import archive, response, db
+from flask import request, current_app
+from datetime import datetime, timedelta
+from collections import defaultdict
+import logging
+try:
+    import numpy as np
+except Exception:
+    np = None
+
+logger = logging.getLogger(__name__)
+
+INTERVALS = ('day', 'week', 'month')
+
+# (report, start, end, extra) -> payload
+_cache = TTLCache(maxsize=256, ttl=300, name='analytics')
+
+def _date_range():
+    """[start, end) from ?start=&end= (ISO dates or datetimes); default last 30 days"""
+    end = request.args.get('end')
+    start = request.args.get('start')
+    if end:
+        end = parse_datetime(end, is_end=True)
+    else:
+        # whole days, so repeated default requests share a cache entry
+        today = datetime.utcnow().date()
+        end = datetime(today.year, today.month, today.day) + timedelta(days=1)
+    start = parse_datetime(start) if start else end - timedelta(days=30)
+    if start >= end:
+        raise ValueError('start must be before end')
+    return start, end
+
+def _in_range(T, start, end):
+    return (
+        T.created_at >= start,
+        T.created_at < end,
+        T.status != 'cancelled'
+    )
+
+def _lines(start, end):
+    """Order lines in range from live and archived orders, as a subquery"""
+    return archive.union_all(lambda T, I: db.select(
+        I.transaction_id,
+        I.product_id,
+        I.quantity,
+        I.subtotal
+    ).join(T, T.id == I.transaction_id).where(*_in_range(T, start, end)))
+
+def _cached(report, start, end, extra, build):
+    key = (report, start, end, extra)
+    data = _cache.get(key)
+    if data is None:
+        data = build()
+        _cache.set(key, data, ttl=current_app.config.get('ANALYTICS_CACHE_TTL', 300))
+    return data
+
+def _range_meta(start, end):
+    return {'start': start.isoformat(), 'end': end.isoformat()}
+
+def _run(report, build):
+    try:
+        start, end = _date_range()
+    except ValueError as e:
+        return response.bad_request([], f"Invalid date range: {e}")
+    try:
+        return response.ok(build(start, end), "")
+    except ValueError as e:
+        return response.bad_request([], str(e))
+    except Exception as e:
+        logger.exception('%s analytics failed', report)
+        return response.server_error([], f"Error: {e}")
+
+def top_sellers():
+    limit = max(1, min(request.args.get('limit', 10, type=int), 100))
+
+    def build(start, end):
+        def query():
+            lines = _lines(start, end)
+            units = db.func.sum(lines.c.quantity).label('units')
+            rows = db.session.query(
+                lines.c.product_id,
+                Product.name,
+                Product.category,
+                units,
+                db.func.sum(lines.c.subtotal).label('revenue'),
+                db.func.count(db.distinct(lines.c.transaction_id)).label('orders')
+            ).select_from(lines).outerjoin(
+                Product, Product.id == lines.c.product_id
+            ).group_by(
+                lines.c.product_id, Product.name, Product.category
+            ).order_by(units.desc()).limit(limit).all()
+            return {
+                'range': _range_meta(start, end),
+                'products': [{
+                    'product_id': r.product_id,
+                    'name': r.name,
+                    'category': r.category,
+                    'units': int(r.units or 0),
+                    'revenue': float(r.revenue or 0),
+                    'orders': r.orders
+                } for r in rows]
+            }
+        return _cached('top_sellers', start, end, limit, query)
+    return _run('top_sellers', build)
+
+def category_mix():
+    def build(start, end):
+        def query():
+            lines = _lines(start, end)
+            revenue = db.func.sum(lines.c.subtotal).label('revenue')
+            rows = db.session.query(
+                Product.category,
+                revenue,
+                db.func.sum(lines.c.quantity).label('units'),
+                db.func.count(db.distinct(lines.c.transaction_id)).label('orders')
+            ).select_from(lines).outerjoin(
+                Product, Product.id == lines.c.product_id
+            ).group_by(Product.category).order_by(revenue.desc()).all()
+            total = sum(float(r.revenue or 0) for r in rows)
+            return {
+                'range': _range_meta(start, end),
+                'total_revenue': total,
+                'categories': [{
+                    'category': r.category or 'uncategorized',
+                    'revenue': float(r.revenue or 0),
+                    'units': int(r.units or 0),
+                    'orders': r.orders,
+                    'share': round(float(r.revenue or 0) / total, 4) if total else 0
+                } for r in rows]
+            }
+        return _cached('category_mix', start, end, None, query)
+    return _run('category_mix', build)
+
+def _bucket_days(days, revenue, orders, interval):
+    """Re-bucket daily totals into weeks (starting Monday) or months"""
+    if interval == 'day' or not days:
+        return days, revenue, orders
+    if np is not None:
+        unit = 'W' if interval == 'week' else 'M'
+        day_arr = np.array(days, dtype='datetime64[D]')
+        if unit == 'W':
+            # numpy weeks start on Thursday (the epoch); shift to Monday
+            buckets = day_arr - ((day_arr.astype('int64') + 3) % 7).astype('timedelta64[D]')
+        else:
+            buckets = day_arr.astype('datetime64[M]').astype('datetime64[D]')
+        keys, inverse = np.unique(buckets, return_inverse=True)
+        rev = np.bincount(inverse, weights=np.asarray(revenue, dtype=float), minlength=len(keys))
+        cnt = np.bincount(inverse, weights=np.asarray(orders, dtype=float), minlength=len(keys))
+        return keys.astype(object).tolist(), rev.tolist(), cnt.astype(int).tolist()
+    totals = defaultdict(lambda: [0.0, 0])
+    for day, rev, cnt in zip(days, revenue, orders):
+        key = day - timedelta(days=day.weekday()) if interval == 'week' else day.replace(day=1)
+        totals[key][0] += rev
+        totals[key][1] += cnt
+    keys = sorted(totals)
+    return keys, [totals[k][0] for k in keys], [totals[k][1] for k in keys]
+
+def revenue_series():
+    interval = request.args.get('interval', 'day')
+
+    def build(start, end):
+        if interval not in INTERVALS:
+            raise ValueError(f"Invalid interval. Valid: {', '.join(INTERVALS)}")
+
+        def query():
+            orders = archive.union_all(lambda T, I: db.select(
+                T.id, T.created_at, T.total_amount
+            ).where(*_in_range(T, start, end)))
+            day = db.func.date(orders.c.created_at)
+            rows = db.session.query(
+                day.label('day'),
+                db.func.sum(orders.c.total_amount).label('revenue'),
+                db.func.count(orders.c.id).label('orders')
+            ).group_by(day).order_by(day).all()
+            days = [r.day if not isinstance(r.day, str) else datetime.strptime(r.day, '%Y-%m-%d').date() for r in rows]
+            keys, revenue, orders = _bucket_days(
+                days, [float(r.revenue or 0) for r in rows], [r.orders for r in rows], interval
+            )
+            return {
+                'range': _range_meta(start, end),
+                'interval': interval,
+                'series': [{
+                    'period': k.isoformat(),
+                    'revenue': round(rev, 2),
+                    'orders': cnt
+                } for k, rev, cnt in zip(keys, revenue, orders)]
+            }
+        return _cached('revenue', start, end, interval, query)
+    return _run('revenue', build)
+
+def _order_line_columns(start, end):
+    """Stream (transaction_id, quantity, subtotal) in columnar batches"""
+    batch_size = current_app.config.get('ANALYTICS_BATCH_SIZE', 10000)
+    lines = _lines(start, end)
+    stmt = db.select(
+        lines.c.transaction_id,
+        lines.c.quantity,
+        lines.c.subtotal
+    ).execution_options(yield_per=batch_size)
+    for part in db.session.execute(stmt).partitions():
+        ids, quantities, subtotals = zip(*part)
+        yield ids, quantities, subtotals
+
+def _basket_stats(batches):
+    if np is not None:
+        ids, quantities, subtotals = [], [], []
+        for batch_ids, batch_qty, batch_sub in batches:
+            ids.append(np.fromiter(batch_ids, dtype=np.int64, count=len(batch_ids)))
+            quantities.append(np.fromiter(batch_qty, dtype=np.int64, count=len(batch_qty)))
+            subtotals.append(np.fromiter((float(x) for x in batch_sub), dtype=np.float64, count=len(batch_sub)))
+        if not ids:
+            return None
+        _, inverse = np.unique(np.concatenate(ids), return_inverse=True)
+        units = np.bincount(inverse, weights=np.concatenate(quantities))
+        values = np.bincount(inverse, weights=np.concatenate(subtotals))
+        lines = np.bincount(inverse)
+        return {
+            'orders': int(len(values)),
+            'avg_units': float(units.mean()),
+            'avg_lines': float(lines.mean()),
+            'avg_value': float(values.mean()),
+            'median_value': float(np.median(values)),
+            'p90_value': float(np.percentile(values, 90))
+        }
+    per_order = defaultdict(lambda: [0, 0.0, 0])
+    for batch_ids, batch_qty, batch_sub in batches:
+        for tid, qty, sub in zip(batch_ids, batch_qty, batch_sub):
+            acc = per_order[tid]
+            acc[0] += qty
+            acc[1] += float(sub)
+            acc[2] += 1
+    if not per_order:
+        return None
+    orders = list(per_order.values())
+    values = sorted(o[1] for o in orders)
+    n = len(orders)
+    mid = n // 2
+    # linear interpolation, same as numpy.percentile's default
+    pos = 0.9 * (n - 1)
+    lo = int(pos)
+    hi = min(lo + 1, n - 1)
+    return {
+        'orders': n,
+        'avg_units': sum(o[0] for o in orders) / n,
+        'avg_lines': sum(o[2] for o in orders) / n,
+        'avg_value': sum(values) / n,
+        'median_value': values[mid] if n % 2 else (values[mid - 1] + values[mid]) / 2,
+        'p90_value': values[lo] + (values[hi] - values[lo]) * (pos - lo)
+    }
+
+def basket_size():
+    def build(start, end):
+        def query():
+            stats = _basket_stats(_order_line_columns(start, end)) or {
+                'orders': 0, 'avg_units': 0, 'avg_lines': 0,
+                'avg_value': 0, 'median_value': 0, 'p90_value': 0
+            }
+            stats = {k: round(v, 2) if isinstance(v, float) else v for k, v in stats.items()}
+            stats['range'] = _range_meta(start, end)
+            return stats
+        return _cached('basket', start, end, None, query)
+    return _run('basket', build)
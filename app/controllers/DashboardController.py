@@ -0,0 +1,167 @@
+from app.models.user import User
+from app.models.product import Product
+from app.models.stock import Stock
+from app.models.transaction import Transaction, ArchivedTransaction
+from app.models.sales_rollup import DailySales
+from app.models.cart import Cart, CartItem
+from app.cache import TTLCache, registry
+from app import archive, db
+from flask import current_app
+from datetime import datetime
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# user id -> customer dashboard stats; dropped on that user's cart and order writes
+_customer_cache = TTLCache(maxsize=4096, ttl=60, name='customer_dashboard')
+
+_admin_lock = threading.Lock()
+_admin_snapshot = {
+    'stats': None,
+    'taken': 0.0,
+    'generation': 0,
+    'refreshing': False,
+    'hits': 0,
+    'misses': 0
+}
+
+def _admin_cache_stats():
+    with _admin_lock:
+        return {
+            'hits': _admin_snapshot['hits'],
+            'misses': _admin_snapshot['misses'],
+            'entries': int(_admin_snapshot['stats'] is not None)
+        }
+
+registry['admin_dashboard'] = _admin_cache_stats
+
+def _query_admin_stats():
+    """All admin dashboard aggregates in a single round trip"""
+    today = datetime.utcnow().date()
+    today_start = datetime(today.year, today.month, today.day)
+    row = db.session.execute(db.select(
+        db.select(db.func.count(User.id)).scalar_subquery().label('total_users'),
+        db.select(db.func.count(Product.id)).scalar_subquery().label('total_products'),
+        (
+            db.select(db.func.count(Transaction.id)).scalar_subquery()
+            + db.select(db.func.count(ArchivedTransaction.id)).scalar_subquery()
+        ).label('total_transactions'),
+        db.select(db.func.count(Transaction.id)).where(
+            Transaction.created_at >= today_start
+        ).scalar_subquery().label('today_transactions'),
+        db.select(db.func.count(Stock.id)).where(
+            Stock.quantity <= Stock.min_stock
+        ).scalar_subquery().label('low_stock_products'),
+        # read from the rollup rather than scanning every order
+        db.select(db.func.sum(DailySales.revenue)).scalar_subquery().label('total_revenue')
+    )).one()
+    return {
+        'total_users': row.total_users,
+        'total_products': row.total_products,
+        'total_transactions': row.total_transactions,
+        'today_transactions': row.today_transactions,
+        'low_stock_products': row.low_stock_products,
+        'total_revenue': float(row.total_revenue) if row.total_revenue else 0,
+        'dashboard_updated': datetime.utcnow().isoformat()
+    }
+
+def _refresh_admin_stats():
+    with _admin_lock:
+        generation = _admin_snapshot['generation']
+    try:
+        stats = _query_admin_stats()
+    finally:
+        with _admin_lock:
+            _admin_snapshot['refreshing'] = False
+    with _admin_lock:
+        # a write committed while we were querying; our numbers may predate it
+        if generation == _admin_snapshot['generation']:
+            _admin_snapshot['stats'] = stats
+            _admin_snapshot['taken'] = time.monotonic()
+    return stats
+
+def _refresh_in_background(app):
+    def run():
+        with app.app_context():
+            try:
+                _refresh_admin_stats()
+            except Exception:
+                logger.exception('Dashboard refresh failed')
+    threading.Thread(target=run, name='dashboard-refresh', daemon=True).start()
+
+def admin_stats():
+    """Cached admin aggregates.
+
+    Fresh snapshots are served as is. Snapshots older than
+    DASHBOARD_REFRESH_AFTER are still served while a background thread
+    recomputes them. Past DASHBOARD_CACHE_TTL, or after an invalidation, the
+    request recomputes synchronously.
+    """
+    ttl = current_app.config.get('DASHBOARD_CACHE_TTL', 30)
+    refresh_after = current_app.config.get('DASHBOARD_REFRESH_AFTER', 10)
+    with _admin_lock:
+        stats = _admin_snapshot['stats']
+        age = time.monotonic() - _admin_snapshot['taken']
+        if stats is not None and age < ttl:
+            _admin_snapshot['hits'] += 1
+            if age >= refresh_after and not _admin_snapshot['refreshing']:
+                _admin_snapshot['refreshing'] = True
+                _refresh_in_background(current_app._get_current_object())
+            return stats
+        _admin_snapshot['misses'] += 1
+    return _refresh_admin_stats()
+
+def invalidate_admin_stats():
+    with _admin_lock:
+        _admin_snapshot['stats'] = None
+        _admin_snapshot['generation'] += 1
+
+def customer_stats(user_id):
+    """Order totals, recent orders and cart summary for one customer, cached per user"""
+    stats = _customer_cache.get(user_id)
+    if stats is not None:
+        return stats
+    # live and archived orders together
+    orders = archive.union_all(lambda T, I: db.select(
+        T.id,
+        T.transaction_code,
+        T.total_amount,
+        T.status,
+        T.created_at
+    ).where(T.user_id == user_id))
+    total_orders, total_spent = db.session.query(
+        db.func.count(orders.c.id),
+        db.func.sum(orders.c.total_amount)
+    ).one()
+    recent = db.session.query(orders).order_by(orders.c.created_at.desc(), orders.c.id.desc()).limit(5).all()
+    item_count, cart_total = db.session.query(
+        db.func.sum(CartItem.quantity),
+        db.func.sum(CartItem.quantity * Product.price)
+    ).join(
+        Cart, Cart.id == CartItem.cart_id
+    ).outerjoin(
+        Product, Product.id == CartItem.product_id
+    ).filter(Cart.user_id == user_id).one()
+    stats = {
+        'total_orders': total_orders,
+        'total_spent': float(total_spent) if total_spent else 0,
+        'recent_transactions': [{
+            'id': t.id,
+            'transaction_code': t.transaction_code,
+            'total_amount': float(t.total_amount) if t.total_amount else 0,
+            'status': t.status,
+            'created_at': t.created_at.isoformat() if t.created_at else None
+        } for t in recent],
+        'cart': {
+            'item_count': int(item_count or 0),
+            'cart_total': float(cart_total) if cart_total else 0
+        },
+        'dashboard_updated': datetime.utcnow().isoformat()
+    }
+    _customer_cache.set(user_id, stats, ttl=current_app.config.get('CUSTOMER_DASHBOARD_CACHE_TTL', 60))
+    return stats
+
+def invalidate_customer_stats(user_id):
+    _customer_cache.pop(int(user_id))
@@ -0,0 +1,167 @@
+from app.models.product import Product
+from app.models.user import User
+from app.params import parse_datetime
+from app import archive, response, db
+from flask import request, current_app, Response, stream_with_context
+from datetime import datetime
+import csv
+import io
+import json
+import zlib
+
+FORMATS = ('csv', 'jsonl')
+CSV_COLUMNS = (
+    'transaction_id', 'transaction_code', 'created_at', 'user_id', 'username',
+    'status', 'payment_method', 'total_amount', 'item_id', 'product_id',
+    'product_name', 'quantity', 'price', 'subtotal'
+)
+# bytes buffered before a chunk is handed to the client
+CHUNK_SIZE = 64 * 1024
+
+def _number(value):
+    return float(value) if value is not None else None
+
+def iter_lines(start=None, end=None, status=None, batch_size=None):
+    """One row per order line (orders without lines give one row with empty item fields).
+
+    Rows come off a server-side cursor in batches. Archived orders come first,
+    then live ones; each part is ordered by (created_at, id), so lines of the
+    same order are adjacent.
+    """
+    if batch_size is None:
+        batch_size = current_app.config.get('EXPORT_BATCH_SIZE', 5000)
+    for T, I in reversed(archive.PAIRS):
+        stmt = db.select(
+            T.id.label('transaction_id'),
+            T.transaction_code,
+            T.created_at,
+            T.user_id,
+            User.username,
+            T.status,
+            T.payment_method,
+            T.total_amount,
+            I.id.label('item_id'),
+            I.product_id,
+            Product.name.label('product_name'),
+            I.quantity,
+            I.price,
+            I.subtotal
+        ).outerjoin(
+            User, User.id == T.user_id
+        ).outerjoin(
+            I, I.transaction_id == T.id
+        ).outerjoin(
+            Product, Product.id == I.product_id
+        )
+        if start is not None:
+            stmt = stmt.where(T.created_at >= start)
+        if end is not None:
+            stmt = stmt.where(T.created_at < end)
+        if status:
+            stmt = stmt.where(T.status == status)
+        stmt = stmt.order_by(
+            T.created_at, T.id, I.id
+        ).execution_options(stream_results=True, yield_per=batch_size)
+        for row in db.session.execute(stmt):
+            yield row
+
+def csv_chunks(rows):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(CSV_COLUMNS)
+    for row in rows:
+        writer.writerow((
+            row.transaction_id, row.transaction_code,
+            row.created_at.isoformat() if row.created_at else '',
+            row.user_id, row.username, row.status, row.payment_method,
+            row.total_amount, row.item_id, row.product_id, row.product_name,
+            row.quantity, row.price, row.subtotal
+        ))
+        if buffer.tell() >= CHUNK_SIZE:
+            yield buffer.getvalue().encode('utf-8')
+            buffer.seek(0)
+            buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode('utf-8')
+
+def _order_record(row):
+    return {
+        'id': row.transaction_id,
+        'transaction_code': row.transaction_code,
+        'created_at': row.created_at.isoformat() if row.created_at else None,
+        'user_id': row.user_id,
+        'username': row.username,
+        'status': row.status,
+        'payment_method': row.payment_method,
+        'total_amount': _number(row.total_amount),
+        'items': []
+    }
+
+def jsonl_chunks(rows):
+    """One JSON object per order, lines nested under 'items'"""
+    parts = []
+    size = 0
+    order = None
+    for row in rows:
+        if order is None or order['id'] != row.transaction_id:
+            if order is not None:
+                line = json.dumps(order) + '\n'
+                parts.append(line)
+                size += len(line)
+                if size >= CHUNK_SIZE:
+                    yield ''.join(parts).encode('utf-8')
+                    parts = []
+                    size = 0
+            order = _order_record(row)
+        if row.item_id is not None:
+            order['items'].append({
+                'id': row.item_id,
+                'product_id': row.product_id,
+                'product_name': row.product_name,
+                'quantity': row.quantity,
+                'price': _number(row.price),
+                'subtotal': _number(row.subtotal)
+            })
+    if order is not None:
+        parts.append(json.dumps(order) + '\n')
+    if parts:
+        yield ''.join(parts).encode('utf-8')
+
+def gzip_chunks(chunks):
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+def export_chunks(fmt, start=None, end=None, status=None, gzip=False):
+    rows = iter_lines(start, end, status)
+    chunks = csv_chunks(rows) if fmt == 'csv' else jsonl_chunks(rows)
+    return gzip_chunks(chunks) if gzip else chunks
+
+def transactions_export():
+    fmt = request.args.get('format', 'csv')
+    if fmt not in FORMATS:
+        return response.bad_request([], f"Invalid format. Valid: {', '.join(FORMATS)}")
+    try:
+        start = parse_datetime(request.args['start']) if request.args.get('start') else None
+        end = parse_datetime(request.args['end'], is_end=True) if request.args.get('end') else None
+    except ValueError as e:
+        return response.bad_request([], f"Invalid date range: {e}")
+    gzip = request.args.get('gzip', '').lower() in ('1', 'true', 'yes')
+    filename = f"transactions-{datetime.utcnow().strftime('%Y%m%d%H%M%S')}.{fmt}"
+    mimetype = 'text/csv' if fmt == 'csv' else 'application/x-ndjson'
+    if gzip:
+        filename += '.gz'
+        mimetype = 'application/gzip'
+    body = export_chunks(fmt, start, end, request.args.get('status'), gzip)
+    # no Content-Length, so the body goes out with chunked transfer encoding
+    return Response(
+        stream_with_context(body),
+        mimetype=mimetype,
+        headers={
+            'Content-Disposition': f'attachment; filename="{filename}"',
+            'X-Accel-Buffering': 'no'
+        }
+    )
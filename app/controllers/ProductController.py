@@ -1,11 +1,15 @@
 from app.models.product import Product
 from app.models.stock import Stock
+from app.controllers.StockController import record_movement
 from app import response, db
 from flask import request
 import os
 from werkzeug.utils import secure_filename
 import shutil
 from datetime import datetime
+import logging
+
+logger = logging.getLogger(__name__)
 
 UPLOAD_FOLDER = 'static/img/products'
 ALLOWED_EXTENSIONS = {'png', 'jpg', 'jpeg', 'gif', 'webp'}
@@ -25,13 +29,33 @@ def normalize_image_url(url):
         url = url[len('static/'):]
     return url
 
+SORTS = ('best_selling',)
+
 def index():
     try:
-        products = Product.query.all()
+        sort = request.args.get('sort')
+        if sort and sort not in SORTS:
+            return response.bad_request([], f"Invalid sort. Valid: {', '.join(SORTS)}")
+        query = Product.query
+        if sort == 'best_selling':
+            query = query.order_by(Product.sold_count.desc(), Product.id.desc())
+        products = query.all()
+        data = transform(products)
+        return response.ok(data, "")
+    except Exception as e:
+        logger.exception('Product index failed')
+        return response.server_error([], f"Error: {e}")
+
+def best_sellers():
+    try:
+        limit = max(1, min(request.args.get('limit', 10, type=int), 100))
+        products = Product.query.filter(
+            Product.is_available == True
+        ).order_by(Product.sold_count.desc(), Product.id.desc()).limit(limit).all()
         data = transform(products)
         return response.ok(data, "")
     except Exception as e:
-        print(e)
+        logger.exception('Product best_sellers failed')
         return response.server_error([], f"Error: {e}")
 
 def show(id):
@@ -44,7 +68,7 @@ def show(id):
         return response.ok(data, "")
 
     except Exception as e:
-        print("SHOW PRODUCT ERROR:", e)
+        logger.exception('Product show failed')
         return response.server_error([], f"Error: {e}")
 
 
@@ -122,8 +146,8 @@ def store():
                         if not os.path.exists(fe_img_dir):
                             os.makedirs(fe_img_dir)
                         shutil.copy(image_path, os.path.join(fe_img_dir, filename))
-                    except Exception as e:
-                        print('FE copy error (store):', e)
+                    except Exception:
+                        logger.exception('Copying product image to the frontend failed (store)')
 
             if hasattr(product, 'calculate_discount'):
                 try:
@@ -137,10 +161,11 @@ def store():
                 stock_quantity = 0
             stock = Stock(
                 product_id=product.id,
-                quantity=stock_quantity,
+                quantity=0,
                 min_stock=int(request.form.get('min_stock', 10))
             )
             db.session.add(stock)
+            record_movement(product.id, stock_quantity, 'initial', stock=stock)
             db.session.commit()
             return response.created([], "Product created successfully")
         else:
@@ -186,10 +211,11 @@ def store():
             stock_quantity = data.get('stock', 0)
             stock = Stock(
                 product_id=product.id,
-                quantity=stock_quantity,
+                quantity=0,
                 min_stock=data.get('min_stock', 10)
             )
             db.session.add(stock)
+            record_movement(product.id, stock_quantity, 'initial', stock=stock)
             db.session.commit()
             return response.created([], "Product created successfully")
         
@@ -247,8 +273,8 @@ def update(id):
                         if not os.path.exists(fe_img_dir):
                             os.makedirs(fe_img_dir)
                         shutil.copy(image_path, os.path.join(fe_img_dir, filename))
-                    except Exception as e:
-                        print('FE copy error (update):', e)
+                    except Exception:
+                        logger.exception('Copying product image to the frontend failed (update)')
 
             if hasattr(product, 'calculate_discount'):
                 try:
@@ -287,7 +313,7 @@ def update(id):
         return response.ok([], "Product updated successfully")
         
     except Exception as e:
-        print(e)
+        logger.exception('Product update failed')
         return response.server_error([], f"Error: {e}")
 
 def delete(id):
@@ -301,7 +327,7 @@ def delete(id):
         return response.ok([], "Product deleted successfully")
         
     except Exception as e:
-        print(e)
+        logger.exception('Product delete failed')
         return response.server_error([], f"Error: {e}")
 
 def transform(products):
@@ -358,6 +384,7 @@ def transform(products):
             'is_discounted': product.is_discounted,
             'discount_percentage': product.discount_percentage,
             'rating': product.rating,
+            'sold_count': product.sold_count or 0,
             'stock': product.stocks.quantity if product.stocks else 0,
             'weight': product.weight,
             'type': product.type,
@@ -426,6 +453,7 @@ def single_transform(product):
         'is_discounted': product.is_discounted,
         'discount_percentage': product.discount_percentage,
         'rating': product.rating,
+        'sold_count': product.sold_count or 0,
         'stock': product.stocks.quantity if product.stocks else 0,
         'weight': product.weight,
         'type': product.type,
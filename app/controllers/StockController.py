@@ -1,8 +1,14 @@
 from app.models.stock import Stock
 from app.models.product import Product
+from app.models.stock_movement import StockMovement, StockSnapshot
+from app.controllers.DashboardController import invalidate_admin_stats
+from app.cache import on_commit
 from app import response, db
 from flask import request
 from datetime import datetime 
+import logging
+
+logger = logging.getLogger(__name__)
 
 def index():
     try:
@@ -10,7 +16,7 @@ def index():
         data = transform(stocks)
         return response.ok(data, "")
     except Exception as e:
-        print(e)
+        logger.exception('Stock index failed')
         return response.server_error([], f"Error: {e}")
 
 def show(id):
@@ -21,7 +27,7 @@ def show(id):
         data = single_transform(stock)
         return response.ok(data, "")
     except Exception as e:
-        print(e)
+        logger.exception('Stock show failed')
         return response.server_error([], f"Error: {e}")
 
 def store():
@@ -37,15 +43,16 @@ def store():
             return response.bad_request([], "Stock already exists for this product")
         stock = Stock(
             product_id=product_id,
-            quantity=quantity,
+            quantity=0,
             min_stock=min_stock,
             last_restock=datetime.utcnow() 
         )
         db.session.add(stock)
+        record_movement(product_id, quantity, 'initial', stock=stock)
         db.session.commit()
         return response.created(single_transform(stock), "Stock created successfully")
     except Exception as e:
-        print(e)
+        logger.exception('Stock store failed')
         return response.server_error([], f"Error: {e}")
 
 def update(id):
@@ -55,7 +62,7 @@ def update(id):
             return response.not_found([], "Stock not found")
         quantity = request.json.get('quantity')
         if quantity is not None:
-            stock.quantity = quantity
+            record_movement(stock.product_id, quantity - stock.quantity, 'adjustment', stock=stock)
         min_stock = request.json.get('min_stock')
         if min_stock is not None:
             stock.min_stock = min_stock
@@ -64,7 +71,7 @@ def update(id):
         db.session.commit()
         return response.ok(single_transform(stock), "Stock updated successfully")
     except Exception as e:
-        print(e)
+        logger.exception('Stock update failed')
         return response.server_error([], f"Error: {e}")
 
 def delete(id):
@@ -72,11 +79,12 @@ def delete(id):
         stock = Stock.query.filter_by(id=id).first()
         if not stock:
             return response.not_found([], "Stock not found")
+        record_movement(stock.product_id, -stock.quantity, 'stock_deleted', stock=stock)
         db.session.delete(stock)
         db.session.commit()
         return response.ok([], "Stock deleted successfully")
     except Exception as e:
-        print(e)
+        logger.exception('Stock delete failed')
         return response.server_error([], f"Error: {e}")
 
 def restock():
@@ -92,18 +100,18 @@ def restock():
                 return response.not_found([], "Product not found")
             stock = Stock(
                 product_id=product_id,
-                quantity=quantity,
+                quantity=0,
                 min_stock=10,
                 last_restock=datetime.utcnow()
             )
             db.session.add(stock)
         else:
-            stock.quantity += quantity
             stock.last_restock = datetime.utcnow() 
+        record_movement(product_id, quantity, 'restock', stock=stock)
         db.session.commit()
         return response.ok(single_transform(stock), f"Restocked {quantity} items successfully")
     except Exception as e:
-        print(e)
+        logger.exception('Stock restock failed')
         return response.server_error([], f"Error: {e}")
 
 def check_low_stock():
@@ -112,45 +120,165 @@ def check_low_stock():
         data = transform(low_stocks)
         return response.ok(data, "Low stock items")
     except Exception as e:
-        print(e)
+        logger.exception('Stock check_low_stock failed')
         return response.server_error([], f"Error: {e}")
 
-def reduce_stock(product_id, quantity):
+def reduce_stock(product_id, quantity, reference_id=None):
     """Helper function to reduce stock (used by TransactionController)"""
     try:
-        stock = Stock.query.filter_by(product_id=product_id).first()
+        stock = Stock.query.filter_by(product_id=product_id).with_for_update().populate_existing().first()
         if not stock:
             return False, f"Stock not found for product {product_id}"
         if stock.quantity < quantity:
             return False, f"Insufficient stock. Available: {stock.quantity}, Requested: {quantity}"
-        stock.quantity -= quantity
-        stock.updated_at = datetime.utcnow()
+        record_movement(product_id, -quantity, 'sale', reference_id, stock=stock)
         return True, "Stock reduced successfully"
     except Exception as e:
         return False, str(e)
 
-def increase_stock(product_id, quantity):
+def increase_stock(product_id, quantity, reason='restock', reference_id=None):
     """Helper function to increase stock"""
     try:
         stock = Stock.query.filter_by(product_id=product_id).first()
         if not stock:
             stock = Stock(
                 product_id=product_id,
-                quantity=quantity,
+                quantity=0,
                 min_stock=10,
                 last_restock=datetime.utcnow()
             )
             db.session.add(stock)
         else:
-            stock.quantity += quantity
             stock.last_restock = datetime.utcnow()
-            stock.updated_at = datetime.utcnow()
+        record_movement(product_id, quantity, reason, reference_id, stock=stock)
         db.session.commit()
         return True, "Stock increased successfully"
         
     except Exception as e:
         return False, str(e)
 
+def record_movement(product_id, delta, reason, reference_id=None, stock=None):
+    """Apply a quantity change to the stock row and append it to the ledger.
+
+    All writes to Stock.quantity go through here. The caller commits, so the
+    movement lands in the same transaction as the change that caused it. The
+    delta is applied in SQL, so concurrent writers cannot lose each other's
+    updates and the row stays equal to the ledger sum. Products without a
+    stock row are left alone and get no movement; None is returned then.
+    """
+    delta = int(delta or 0)
+    if stock is not None and stock in db.session.new:
+        # not inserted yet, so nobody else can see it
+        stock.quantity = (stock.quantity or 0) + delta
+        stock.updated_at = datetime.utcnow()
+    else:
+        updated = db.session.query(Stock).filter(Stock.product_id == product_id).update({
+            Stock.quantity: db.func.coalesce(Stock.quantity, 0) + delta,
+            Stock.updated_at: datetime.utcnow()
+        }, synchronize_session=False)
+        if not updated:
+            return None
+        if stock is not None:
+            # reload the committed-to value on next access
+            db.session.expire(stock, ['quantity', 'updated_at'])
+    on_commit(invalidate_admin_stats)
+    if delta:
+        db.session.add(StockMovement(
+            product_id=product_id,
+            delta=delta,
+            reason=reason,
+            reference_id=str(reference_id) if reference_id is not None else None
+        ))
+    return stock
+
+def _latest_snapshots():
+    """Latest snapshot per product (product_id, quantity, last_movement_id)"""
+    latest = db.session.query(
+        StockSnapshot.product_id,
+        db.func.max(StockSnapshot.id).label('snapshot_id')
+    ).group_by(StockSnapshot.product_id).subquery()
+    return db.session.query(
+        StockSnapshot.product_id,
+        StockSnapshot.quantity,
+        StockSnapshot.last_movement_id
+    ).join(latest, StockSnapshot.id == latest.c.snapshot_id).subquery()
+
+def _ledger_tails(snapshots):
+    """Movements newer than each product's latest snapshot, summed per product"""
+    return db.session.query(
+        StockMovement.product_id,
+        db.func.sum(StockMovement.delta).label('delta'),
+        db.func.max(StockMovement.id).label('last_movement_id'),
+        db.func.count(StockMovement.id).label('movements')
+    ).outerjoin(
+        snapshots, snapshots.c.product_id == StockMovement.product_id
+    ).filter(
+        StockMovement.id > db.func.coalesce(snapshots.c.last_movement_id, 0)
+    ).group_by(StockMovement.product_id).subquery()
+
+def quantity_at(product_id, at):
+    """Ledger quantity of a product at a point in time.
+
+    Starts from the newest snapshot taken at or before `at` and replays only
+    the movements recorded after it.
+    """
+    snapshot = StockSnapshot.query.filter(
+        StockSnapshot.product_id == product_id,
+        StockSnapshot.created_at <= at
+    ).order_by(StockSnapshot.id.desc()).first()
+    base = snapshot.quantity if snapshot else 0
+    after_id = snapshot.last_movement_id if snapshot else 0
+    tail = db.session.query(db.func.sum(StockMovement.delta)).filter(
+        StockMovement.product_id == product_id,
+        StockMovement.id > after_id,
+        StockMovement.created_at <= at
+    ).scalar()
+    return base + int(tail or 0)
+
+def take_snapshots(min_movements=1):
+    """Compact the ledger by snapshotting every product with enough new movements"""
+    snapshots = _latest_snapshots()
+    tails = _ledger_tails(snapshots)
+    rows = db.session.query(
+        tails.c.product_id,
+        db.func.coalesce(snapshots.c.quantity, 0) + tails.c.delta,
+        tails.c.last_movement_id
+    ).outerjoin(
+        snapshots, snapshots.c.product_id == tails.c.product_id
+    ).filter(tails.c.movements >= min_movements).all()
+    now = datetime.utcnow()
+    db.session.add_all([
+        StockSnapshot(product_id=product_id, quantity=int(quantity), last_movement_id=last_id, created_at=now)
+        for product_id, quantity, last_id in rows
+    ])
+    db.session.commit()
+    return len(rows)
+
+def reconcile():
+    """Compare every stocks row with its ledger balance in a single query.
+
+    Returns the rows that disagree; an empty list means the table and the
+    ledger are consistent.
+    """
+    snapshots = _latest_snapshots()
+    tails = _ledger_tails(snapshots)
+    ledger_quantity = db.func.coalesce(snapshots.c.quantity, 0) + db.func.coalesce(tails.c.delta, 0)
+    rows = db.session.query(
+        Stock.product_id,
+        Stock.quantity,
+        ledger_quantity
+    ).outerjoin(
+        snapshots, snapshots.c.product_id == Stock.product_id
+    ).outerjoin(
+        tails, tails.c.product_id == Stock.product_id
+    ).filter(Stock.quantity != ledger_quantity).all()
+    return [{
+        'product_id': product_id,
+        'stock_quantity': quantity,
+        'ledger_quantity': int(ledger),
+        'difference': quantity - int(ledger)
+    } for product_id, quantity, ledger in rows]
+
 def transform(stocks):
     array = []
     for stock in stocks:
@@ -2,12 +2,23 @@ from app.models.transaction import Transaction, TransactionItem
 from app.models.product import Product
 from app.models.user import User
 from app.models.stock import Stock
+from app.controllers.StockController import record_movement
+from app.controllers.DashboardController import invalidate_admin_stats, invalidate_customer_stats
+from app.cache import TTLCache, on_commit
+from app import archive, rollups
 from app import response, db
-from flask import request
+from flask import request, current_app
 from datetime import datetime
+import logging
 import random
 import string
 
+logger = logging.getLogger(__name__)
+
+# transaction id -> detail dict, only for orders that reached a final status
+_detail_cache = TTLCache(maxsize=2048, ttl=600, name='transaction_detail')
+CACHEABLE_STATUSES = ('completed',)
+
 def generate_transaction_code():
     """Generate unique transaction code"""
     date_str = datetime.now().strftime("%Y%m%d")
@@ -16,23 +27,21 @@ def generate_transaction_code():
 
 def index():
     try:
-        transactions = Transaction.query.all()
+        transactions = list_query().all()
         data = transform(transactions)
         return response.ok(data, "")
     except Exception as e:
-        print(e)
+        logger.exception('Transaction index failed')
         return response.server_error([], f"Error: {e}")
 
 def show(id):
     try:
-        transaction = Transaction.query.filter_by(id=id).first()
-        if not transaction:
+        data = transaction_detail(id)
+        if not data:
             return response.not_found([], "Transaction not found")
-        
-        data = single_transform(transaction)
         return response.ok(data, "")
     except Exception as e:
-        print(e)
+        logger.exception('Transaction show failed')
         return response.server_error([], f"Error: {e}")
 
 def store():
@@ -49,13 +58,15 @@ def store():
             return response.bad_request([], "No items in transaction")
         total_amount = 0
         transaction_items = []
-        for item in items:
+        # lock stock rows in product order so concurrent orders cannot deadlock
+        for item in sorted(items, key=lambda i: i.get('product_id') or 0):
             product_id = item.get('product_id')
             quantity = item.get('quantity', 1)
             product = Product.query.filter_by(id=product_id).first()
             if not product:
                 return response.not_found([], f"Product {product_id} not found")
-            stock = Stock.query.filter_by(product_id=product_id).first()
+            # held until commit, so the check and the decrement cannot interleave
+            stock = Stock.query.filter_by(product_id=product_id).with_for_update().populate_existing().first()
             if not stock or stock.quantity < quantity:
                 return response.bad_request([], f"Insufficient stock for product {product.name}")
             price = float(product.price) if product.price else 0
@@ -79,16 +90,19 @@ def store():
         )
         db.session.add(transaction)
         db.session.flush() 
+        on_commit(invalidate_admin_stats)
+        on_commit(invalidate_customer_stats, transaction.user_id)
         for item in transaction_items:
             item.transaction_id = transaction.id
             db.session.add(item)
-            stock = Stock.query.filter_by(product_id=item.product_id).first()
-            stock.quantity -= item.quantity
+            record_movement(item.product_id, -item.quantity, 'sale', transaction.transaction_code)
+        db.session.flush()
+        rollups.apply_transaction(transaction)
         db.session.commit()
         return response.created(single_transform(transaction), "Transaction created successfully")
     except Exception as e:
         db.session.rollback()
-        print(e)
+        logger.exception('Transaction store failed')
         return response.server_error([], f"Error: {e}")
 
 def update_status(id):
@@ -100,20 +114,24 @@ def update_status(id):
         valid_statuses = ['pending', 'paid', 'processing', 'shipped', 'completed', 'cancelled']
         if new_status not in valid_statuses:
             return response.bad_request([], f"Invalid status. Valid: {', '.join(valid_statuses)}")
+        rollups.apply_status_change(transaction, transaction.status, new_status)
         transaction.status = new_status
+        on_commit(invalidate_transaction_detail, transaction.id)
+        on_commit(invalidate_admin_stats)
+        on_commit(invalidate_customer_stats, transaction.user_id)
         db.session.commit()
         return response.ok([], f"Transaction status updated to {new_status}")
     except Exception as e:
-        print(e)
+        logger.exception('Transaction update_status failed')
         return response.server_error([], f"Error: {e}")
 
 def user_transactions(user_id):
     try:
-        transactions = Transaction.query.filter_by(user_id=user_id).all()
+        transactions = list_query(user_id=user_id, include_archive=True).all()
         data = transform(transactions)
         return response.ok(data, f"Transactions for user {user_id}")
     except Exception as e:
-        print(e)
+        logger.exception('Transaction user_transactions failed')
         return response.server_error([], f"Error: {e}")
 
 def delete(id):
@@ -121,51 +139,130 @@ def delete(id):
         transaction = Transaction.query.filter_by(id=id).first()
         if not transaction:
             return response.not_found([], "Transaction not found")
+        if rollups.counts_toward_sales(transaction.status):
+            rollups.apply_transaction(transaction, -1)
         if transaction.status != 'cancelled':
             for item in transaction.items:
-                stock = Stock.query.filter_by(product_id=item.product_id).first()
-                if stock:
-                    stock.quantity += item.quantity
+                record_movement(item.product_id, item.quantity, 'transaction_deleted', transaction.transaction_code)
+        # items have no delete cascade; remove them first
+        for item in transaction.items:
+            db.session.delete(item)
         db.session.delete(transaction)
+        on_commit(invalidate_transaction_detail, transaction.id)
+        on_commit(invalidate_admin_stats)
+        on_commit(invalidate_customer_stats, transaction.user_id)
         db.session.commit()
         return response.ok([], "Transaction deleted successfully")
     except Exception as e:
-        print(e)
+        db.session.rollback()
+        logger.exception('Transaction delete failed')
         return response.server_error([], f"Error: {e}")
 
+def _list_select(T, I, user_id=None):
+    item_count = db.select(db.func.count(I.id)).where(I.transaction_id == T.id).scalar_subquery()
+    stmt = db.select(
+        T.id,
+        T.transaction_code,
+        T.user_id,
+        User.username,
+        T.total_amount,
+        T.status,
+        T.payment_method,
+        item_count.label('item_count'),
+        T.created_at
+    ).outerjoin(User, User.id == T.user_id)
+    if user_id is not None:
+        stmt = stmt.where(T.user_id == user_id)
+    return stmt
+
+def list_query(user_id=None, include_archive=False):
+    """Order list rows with username and item_count, newest first, without loading items or users.
+
+    With include_archive, archived orders are merged in as well.
+    """
+    if include_archive:
+        rows = archive.union_all(lambda T, I: _list_select(T, I, user_id))
+        stmt = db.select(rows).order_by(rows.c.created_at.desc(), rows.c.id.desc())
+    else:
+        stmt = _list_select(Transaction, TransactionItem, user_id).order_by(
+            Transaction.created_at.desc(), Transaction.id.desc()
+        )
+    return db.session.execute(stmt)
+
 def transform(transactions):
+    """Serialize rows from list_query()"""
     array = []
     for transaction in transactions:
         array.append({
             'id': transaction.id,
             'transaction_code': transaction.transaction_code,
             'user_id': transaction.user_id,
-            'username': transaction.user.username if transaction.user else 'Unknown',
+            'username': transaction.username or 'Unknown',
             'total_amount': float(transaction.total_amount) if transaction.total_amount else 0,
             'status': transaction.status,
             'payment_method': transaction.payment_method,
-            'item_count': len(transaction.items),
+            'item_count': transaction.item_count,
             'created_at': transaction.created_at.isoformat() if transaction.created_at else None
         })
     return array
 
 def single_transform(transaction):
+    return transaction_detail(transaction.id)
+
+def _detail_rows(T, I, transaction_id):
+    return db.session.query(
+        T,
+        User.username,
+        I.id.label('item_id'),
+        I.product_id,
+        I.quantity,
+        I.price,
+        I.subtotal,
+        Product.name.label('product_name'),
+        Product.image_url
+    ).outerjoin(
+        User, User.id == T.user_id
+    ).outerjoin(
+        I, I.transaction_id == T.id
+    ).outerjoin(
+        Product, Product.id == I.product_id
+    ).filter(T.id == transaction_id).order_by(I.id).all()
+
+def transaction_detail(transaction_id):
+    """Order header, username and lines with product name/image from one joined query.
+
+    Falls back to the archive when the order is not live. Completed and
+    archived orders no longer change, so their detail is cached. Returns None
+    when the transaction does not exist.
+    """
+    data = _detail_cache.get(transaction_id)
+    if data is not None:
+        return data
+    for T, I in archive.PAIRS:
+        rows = _detail_rows(T, I, transaction_id)
+        if rows:
+            break
+    if not rows:
+        return None
+    transaction = rows[0][0]
     items = []
-    for item in transaction.items:
+    for row in rows:
+        if row.item_id is None:
+            continue
         items.append({
-            'id': item.id,
-            'product_id': item.product_id,
-            'product_name': item.product.name if item.product else 'Unknown',
-            'quantity': item.quantity,
-            'price': float(item.price) if item.price else 0,
-            'subtotal': float(item.subtotal) if item.subtotal else 0
+            'id': row.item_id,
+            'product_id': row.product_id,
+            'product_name': row.product_name,
+            'image_url': row.image_url,
+            'quantity': row.quantity,
+            'price': float(row.price) if row.price else 0,
+            'subtotal': float(row.subtotal) if row.subtotal else 0
         })
-    
-    return {
+    data = {
         'id': transaction.id,
         'transaction_code': transaction.transaction_code,
         'user_id': transaction.user_id,
-        'username': transaction.user.username if transaction.user else 'Unknown',
+        'username': rows[0].username or 'Unknown',
         'total_amount': float(transaction.total_amount) if transaction.total_amount else 0,
         'status': transaction.status,
         'payment_method': transaction.payment_method,
@@ -174,4 +271,10 @@ def single_transform(transaction):
         'items': items,
         'created_at': transaction.created_at.isoformat() if transaction.created_at else None,
         'updated_at': transaction.updated_at.isoformat() if transaction.updated_at else None
-    }
\ No newline at end of file
+    }
+    if transaction.status in CACHEABLE_STATUSES or T is not Transaction:
+        _detail_cache.set(transaction_id, data, ttl=current_app.config.get('TRANSACTION_DETAIL_CACHE_TTL', 600))
+    return data
+
+def invalidate_transaction_detail(transaction_id):
+    _detail_cache.pop(int(transaction_id))
\ No newline at end of file
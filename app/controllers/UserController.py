@@ -1,15 +1,72 @@
 from app.models.user import User
 from app import response, db
+from app.auth import invalidate_principal
+from app.passwords import PasswordPoolBusy
+from app.params import encode_cursor, decode_cursor
 from flask import request
 import json
+import logging
+
+logger = logging.getLogger(__name__)
+
+# password_hash is never selected; address only with ?include=address
+LIST_COLUMNS = (
+    User.id, User.username, User.email, User.phone,
+    User.is_admin, User.is_verified, User.created_at
+)
+OPTIONAL_COLUMNS = {'address': User.address}
+
+def _flag(name):
+    value = request.args.get(name, '').strip().lower()
+    if not value:
+        return None
+    if value in ('1', 'true', 'yes'):
+        return True
+    if value in ('0', 'false', 'no'):
+        return False
+    raise ValueError(f"{name} must be true or false")
 
 def index():
+    """Users by id, paginated with ?cursor= from the previous page.
+
+    Filters: q (username or email prefix), is_admin, is_verified.
+    """
     try:
-        users = User.query.all()
-        data = transform(users)
-        return response.ok(data, "")
+        args = request.args
+        limit = max(1, min(args.get('limit', 50, type=int), 200))
+        include = [f.strip() for f in args.get('include', '').split(',') if f.strip()]
+        unknown = set(include) - set(OPTIONAL_COLUMNS)
+        if unknown:
+            return response.bad_request([], f"Invalid include. Valid: {', '.join(OPTIONAL_COLUMNS)}")
+        query = db.session.query(*LIST_COLUMNS, *(OPTIONAL_COLUMNS[f] for f in include))
+        try:
+            q = args.get('q', '').strip()
+            if q:
+                # a literal 'prefix%' pattern, so the username and email indexes apply
+                pattern = q.replace('/', '//').replace('%', '/%').replace('_', '/_') + '%'
+                query = query.filter(db.or_(
+                    User.username.like(pattern, escape='/'),
+                    User.email.like(pattern, escape='/')
+                ))
+            for name in ('is_admin', 'is_verified'):
+                value = _flag(name)
+                if value is not None:
+                    query = query.filter(getattr(User, name) == value)
+            if args.get('cursor'):
+                last_id, = decode_cursor(args['cursor'], 1)
+                query = query.filter(User.id > int(last_id))
+        except ValueError as e:
+            return response.bad_request([], f"Invalid filter: {e}")
+        rows = query.order_by(User.id).limit(limit + 1).all()
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+        data = transform(rows)
+        return response.ok(
+            data, "", count=len(data), has_more=has_more,
+            next_cursor=encode_cursor(rows[-1].id) if has_more else None
+        )
     except Exception as e:
-        print(e)
+        logger.exception('User index failed')
         return response.server_error([], f"Error: {e}")
 
 def show(id):
@@ -20,7 +77,7 @@ def show(id):
         data = single_transform(user)
         return response.ok(data, "")
     except Exception as e:
-        print(e)
+        logger.exception('User show failed')
         return response.server_error([], f"Error: {e}")
 
 def store():
@@ -46,8 +103,10 @@ def store():
         db.session.add(user)
         db.session.commit()
         return response.created([], "User created successfully")
+    except PasswordPoolBusy as e:
+        return response.service_unavailable([], str(e))
     except Exception as e:
-        print(e)
+        logger.exception('User store failed')
         return response.server_error([], f"Error: {e}")
 
 def update(id):
@@ -62,9 +121,12 @@ def update(id):
         if 'password' in request.json:
             user.set_password(request.json['password'])
         db.session.commit()
+        invalidate_principal(id)
         return response.ok([], "User updated successfully")
+    except PasswordPoolBusy as e:
+        return response.service_unavailable([], str(e))
     except Exception as e:
-        print(e)
+        logger.exception('User update failed')
         return response.server_error([], f"Error: {e}")
 
 def delete(id):
@@ -74,23 +136,28 @@ def delete(id):
             return response.not_found([], "User not found")
         db.session.delete(user)
         db.session.commit()
+        invalidate_principal(id)
         return response.ok([], "User deleted successfully")
     except Exception as e:
-        print(e)
+        logger.exception('User delete failed')
         return response.server_error([], f"Error: {e}")
 
 def transform(users):
+    """Serialize rows from index(); address is present only when it was selected"""
     array = []
     for user in users:
-        array.append({
+        data = {
             'id': user.id,
             'username': user.username,
             'email': user.email,
             'phone': user.phone,
-            'address': user.address, 
             'is_admin': user.is_admin,
+            'is_verified': user.is_verified,
             'created_at': user.created_at.isoformat() if user.created_at else None
-        })
+        }
+        if 'address' in user._fields:
+            data['address'] = user.address
+        array.append(data)
     return array
 
 def single_transform(user):
@@ -0,0 +1,101 @@
+import logging
+import threading
+import time
+from sqlalchemy.exc import TimeoutError as PoolTimeout
+from sqlalchemy.pool import QueuePool
+
+logger = logging.getLogger(__name__)
+
+class TimedQueuePool(QueuePool):
+    """QueuePool that records how long checkouts wait for a connection"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._stats_lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        except PoolTimeout:
+            with self._stats_lock:
+                self.timeouts += 1
+            raise
+        finally:
+            waited = time.perf_counter() - started
+            with self._stats_lock:
+                self.checkouts += 1
+                self.wait_total += waited
+                if waited > self.wait_max:
+                    self.wait_max = waited
+
+    def stats(self):
+        with self._stats_lock:
+            checkouts, timeouts = self.checkouts, self.timeouts
+            wait_total, wait_max = self.wait_total, self.wait_max
+        return {
+            'size': self.size(),
+            'checked_in': self.checkedin(),
+            'checked_out': self.checkedout(),
+            'overflow': max(self.overflow(), 0),
+            'max_overflow': self._max_overflow,
+            'checkouts': checkouts,
+            'timeouts': timeouts,
+            'wait_avg_ms': round(wait_total / checkouts * 1000, 3) if checkouts else 0,
+            'wait_max_ms': round(wait_max * 1000, 3)
+        }
+
+def engine_options(app):
+    """Pool settings from DB_POOL_*; SQLite keeps SQLAlchemy's defaults"""
+    options = dict(app.config.get('SQLALCHEMY_ENGINE_OPTIONS') or {})
+    if app.config['SQLALCHEMY_DATABASE_URI'].startswith('sqlite'):
+        return options
+    options.setdefault('poolclass', TimedQueuePool)
+    options.setdefault('pool_size', app.config.get('DB_POOL_SIZE', 10))
+    options.setdefault('max_overflow', app.config.get('DB_MAX_OVERFLOW', 20))
+    options.setdefault('pool_timeout', app.config.get('DB_POOL_TIMEOUT', 10))
+    options.setdefault('pool_recycle', app.config.get('DB_POOL_RECYCLE', 1800))
+    options.setdefault('pool_pre_ping', app.config.get('DB_POOL_PRE_PING', True))
+    return options
+
+def init_app(app):
+    """Call before db.init_app so the engine is built with these options"""
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = engine_options(app)
+
+def warm_up(app):
+    """Open DB_POOL_WARMUP connections up front so the first requests skip the connect"""
+    from app import db
+    count = app.config.get('DB_POOL_WARMUP', 0)
+    if count <= 0:
+        return 0
+    with app.app_context():
+        engine = db.engine
+        count = min(count, engine.pool.size()) if isinstance(engine.pool, QueuePool) else count
+        connections = []
+        try:
+            for _ in range(count):
+                connections.append(engine.connect())
+        except Exception:
+            logger.exception('Connection pool warm-up failed')
+        finally:
+            for connection in connections:
+                connection.close()
+    return len(connections)
+
+def pool_stats():
+    """Pool state per engine, keyed by bind name ('default' for the primary)"""
+    from app import db
+    stats = {}
+    for key, engine in db.engines.items():
+        pool = engine.pool
+        if isinstance(pool, TimedQueuePool):
+            data = pool.stats()
+        else:
+            data = {'status': pool.status()}
+        data['pool_class'] = type(pool).__name__
+        stats[key or 'default'] = data
+    return stats
@@ -0,0 +1,80 @@
+"""Primary/replica routing for db.session.
+
+Replicas are the SQLALCHEMY_BINDS named replica_N (from DB_REPLICA_URIS).
+SELECTs issued while serving a GET/HEAD/OPTIONS request go to one replica,
+picked once per request. Everything else goes to the primary:
+- writes, flushes and SELECT ... FOR UPDATE;
+- any read in a session that has already written;
+- work outside a request (scripts, background threads);
+- a user's requests for DB_REPLICA_STICKY_SECONDS after that user committed a
+  write, so they read their own writes.
+
+Stickiness is tracked per process, so it relies on a user's follow-up
+requests landing on the same worker within the window, or on the window
+covering replica lag.
+
+To try it locally, point DATABASE_URL and DB_REPLICA_URIS at two SQLite files
+and copy the primary file over the replica file whenever you want them in
+sync.
+"""
+import random
+from flask import current_app, g, has_request_context, request
+from flask_sqlalchemy.session import Session
+from app.cache import TTLCache
+
+READ_METHODS = ('GET', 'HEAD', 'OPTIONS')
+REPLICA_PREFIX = 'replica_'
+
+# user id -> True while that user's reads are pinned to the primary
+_sticky = TTLCache(maxsize=65536, ttl=5, name='replica_sticky')
+
+def _is_write(clause):
+    return getattr(clause, 'is_dml', False)
+
+def _is_plain_select(clause):
+    return getattr(clause, 'is_select', False) and getattr(clause, '_for_update_arg', None) is None
+
+def _stick(user_id):
+    _sticky.set(user_id, True, ttl=current_app.config.get('DB_REPLICA_STICKY_SECONDS', 5))
+
+class RoutingSession(Session):
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None:
+            if self._flushing or _is_write(clause):
+                self._mark_write()
+            elif _is_plain_select(clause):
+                replica = self._replica()
+                if replica is not None:
+                    return replica
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+    def _mark_write(self):
+        if self.info.get('db_wrote'):
+            return
+        self.info['db_wrote'] = True
+        if has_request_context():
+            principal = g.get('principal')
+            if principal is not None:
+                from app.cache import on_commit
+                on_commit(_stick, principal.id)
+
+    def _replica(self):
+        if self.info.get('db_wrote') or self.info.get('db_primary'):
+            return None
+        if not has_request_context() or request.method not in READ_METHODS:
+            return None
+        key = self.info.get('db_replica')
+        if key is None:
+            keys = [k for k in self._db.engines if k and k.startswith(REPLICA_PREFIX)]
+            if not keys:
+                return None
+            principal = g.get('principal')
+            if principal is not None and _sticky.get(principal.id):
+                return None
+            key = self.info['db_replica'] = random.choice(keys)
+        return self._db.engines[key]
+
+def use_primary():
+    """Send the rest of this request's reads to the primary"""
+    from app import db
+    db.session.info['db_primary'] = True
@@ -0,0 +1,86 @@
+"""Liveness and readiness checks for the load balancer.
+
+Liveness only says the process is serving requests. Readiness first reads the
+primary's pool state, which is cheap and done on every call. If every
+connection is already checked out, the node reports not ready straight away
+instead of queueing behind pool_timeout. Otherwise a `SELECT 1` runs on a
+background thread and is given HEALTH_PROBE_TIMEOUT seconds. Its result is
+reused for HEALTH_CACHE_SECONDS, so a probe storm costs one query per
+interval, and a hung probe is never stacked with another one.
+"""
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+from datetime import datetime
+from flask import current_app
+from sqlalchemy import text
+from sqlalchemy.pool import QueuePool
+
+_lock = threading.Lock()
+_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='health-probe')
+_inflight = [None]
+_last = {}
+
+def pool_saturation(engine):
+    """Checked-out share of the pool's capacity, or None for pools without a limit"""
+    pool = engine.pool
+    if not isinstance(pool, QueuePool):
+        return None
+    max_overflow = pool._max_overflow
+    capacity = pool.size() + max_overflow if max_overflow >= 0 else None
+    checked_out = pool.checkedout()
+    return {
+        'size': pool.size(),
+        'max_overflow': max_overflow,
+        'checked_out': checked_out,
+        'saturation': round(checked_out / capacity, 3) if capacity else None,
+        'exhausted': capacity is not None and checked_out >= capacity
+    }
+
+def _probe(app):
+    from app import db
+    started = time.perf_counter()
+    with app.app_context():
+        with db.engine.connect() as connection:
+            connection.execute(text('SELECT 1')).scalar()
+    return (time.perf_counter() - started) * 1000
+
+def _run_probe(app, timeout):
+    with _lock:
+        future, started = _inflight[0] or (None, 0)
+        if future is None or future.done():
+            started = time.monotonic()
+            future = _executor.submit(_probe, app)
+            _inflight[0] = (future, started)
+    try:
+        # a probe still stuck from an earlier call gets no fresh wait
+        latency = future.result(timeout=max(timeout - (time.monotonic() - started), 0))
+        return {'status': 'up', 'latency_ms': round(latency, 2)}
+    except FutureTimeout:
+        return {'status': 'down', 'error': f'SELECT 1 did not finish within {timeout}s'}
+    except Exception as e:
+        return {'status': 'down', 'error': str(e).split('\n')[0][:200]}
+
+def database_status():
+    """Cached SELECT 1 result on the primary"""
+    app = current_app._get_current_object()
+    ttl = app.config.get('HEALTH_CACHE_SECONDS', 2)
+    now = time.monotonic()
+    with _lock:
+        cached = _last.get('result')
+        if cached is not None and now - _last['at'] < ttl:
+            return dict(cached, cached=True)
+    result = _run_probe(app, app.config.get('HEALTH_PROBE_TIMEOUT', 1))
+    result['checked_at'] = datetime.utcnow().isoformat()
+    with _lock:
+        _last['result'], _last['at'] = result, time.monotonic()
+    return dict(result, cached=False)
+
+def readiness():
+    """(ready, details)"""
+    from app import db
+    pool = pool_saturation(db.engine)
+    if pool and pool['exhausted']:
+        return False, {'database': {'status': 'unknown', 'error': 'connection pool exhausted'}, 'pool': pool}
+    database = database_status()
+    return database['status'] == 'up', {'database': database, 'pool': pool}
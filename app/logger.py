@@ -0,0 +1,133 @@
+"""Structured, non-blocking logging.
+
+Records from the `app` logger tree (and Flask's app.logger, which shares the
+name) go onto a bounded in-memory queue. A QueueListener thread formats them
+and writes them out, as one JSON object per line by default. Request threads
+never wait on log I/O: when the queue is full, the record is dropped and
+counted instead.
+
+Each request gets an id, taken from X-Request-ID or generated. The id is
+attached to every record logged while serving it and echoed in the response.
+INFO-and-below records are sampled at LOG_INFO_SAMPLE_RATE. That applies
+mostly to the per-request access log; warnings and errors are always kept.
+
+Modules log through logging.getLogger(__name__).
+"""
+import atexit
+import json
+import logging
+import queue
+import random
+import sys
+import time
+import uuid
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from flask import g, has_request_context, request
+
+ROOT = 'app'
+# LogRecord attributes that are not user-supplied `extra` fields
+_RESERVED = set(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime'}
+
+_listener = None
+_handler = None
+access_logger = logging.getLogger('app.access')
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record):
+        data = {
+            'ts': datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage()
+        }
+        for key, value in vars(record).items():
+            if key not in _RESERVED and not key.startswith('_'):
+                data[key] = value
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            data['exc'] = record.exc_text
+        return json.dumps(data, default=str)
+
+class RequestContextFilter(logging.Filter):
+    """Stamp request id, method and path while the record is still on the request thread"""
+
+    def filter(self, record):
+        if has_request_context():
+            record.request_id = g.get('request_id')
+            record.method = request.method
+            record.path = request.path
+        return True
+
+class SamplingFilter(logging.Filter):
+    def __init__(self, rate):
+        super().__init__()
+        self.rate = rate
+
+    def filter(self, record):
+        return record.levelno > logging.INFO or self.rate >= 1 or random.random() < self.rate
+
+class NonBlockingQueueHandler(QueueHandler):
+    def __init__(self, log_queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record):
+        # resolve the message and traceback here, but leave JSON encoding to the listener
+        record = logging.makeLogRecord(vars(record))
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+def _start_request():
+    g.request_id = request.headers.get('X-Request-ID') or uuid.uuid4().hex
+    g._log_started = time.perf_counter()
+
+def _finish_request(response):
+    response.headers['X-Request-ID'] = g.get('request_id', '')
+    started = g.get('_log_started')
+    if started is not None and access_logger.isEnabledFor(logging.INFO):
+        access_logger.info('request', extra={
+            'status': response.status_code,
+            'duration_ms': round((time.perf_counter() - started) * 1000, 2)
+        })
+    return response
+
+def _stop():
+    if _listener is not None:
+        _listener.stop()
+
+def init_app(app):
+    global _listener, _handler
+    logger = logging.getLogger(ROOT)
+    logger.setLevel(app.config.get('LOG_LEVEL', 'INFO'))
+    access_logger.disabled = not app.config.get('LOG_ACCESS', True)
+    if _listener is None:
+        output = logging.StreamHandler(sys.stdout)
+        if app.config.get('LOG_FORMAT', 'json') == 'json':
+            output.setFormatter(JsonFormatter())
+        else:
+            output.setFormatter(logging.Formatter('%(asctime)s %(levelname)s %(name)s [%(request_id)s] %(message)s', defaults={'request_id': '-'}))
+        _handler = NonBlockingQueueHandler(queue.Queue(app.config.get('LOG_QUEUE_SIZE', 10000)))
+        _handler.addFilter(RequestContextFilter())
+        _listener = QueueListener(_handler.queue, output, respect_handler_level=True)
+        _listener.start()
+        atexit.register(_stop)
+        logger.addHandler(_handler)
+        logger.propagate = False
+    for existing in list(_handler.filters):
+        if isinstance(existing, SamplingFilter):
+            _handler.removeFilter(existing)
+    _handler.addFilter(SamplingFilter(app.config.get('LOG_INFO_SAMPLE_RATE', 1.0)))
+    app.before_request(_start_request)
+    app.after_request(_finish_request)
@@ -0,0 +1,252 @@
+"""Prometheus text-format telemetry served at /metrics.
+
+Request counters and latency histograms live in a per-process registry. That
+registry is updated under one short lock per request. Pool and cache figures
+are read at scrape time.
+
+Under a prefork server (without app preloading) set METRICS_DIR to a
+directory shared by the workers and empty at server start. Each worker
+writes its snapshot to metrics_<pid>.json there every METRICS_FLUSH_INTERVAL
+seconds and on every scrape it serves. A scrape sums all snapshots. Counters and histograms of
+exited workers are kept, so totals stay monotonic; their gauges are dropped.
+"""
+import atexit
+import glob
+import json
+import logging
+import os
+import threading
+import time
+from flask import Response, current_app, g, request
+
+logger = logging.getLogger(__name__)
+
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+HELP = {
+    'http_requests_total': ('counter', 'Requests by method, endpoint and status'),
+    'http_request_duration_seconds': ('histogram', 'Request latency by method and endpoint'),
+    'http_requests_in_flight': ('gauge', 'Requests currently being served'),
+    'db_pool_size': ('gauge', 'Configured pool size'),
+    'db_pool_checked_out': ('gauge', 'Connections in use'),
+    'db_pool_overflow': ('gauge', 'Connections open beyond pool_size'),
+    'db_pool_checkouts_total': ('counter', 'Connection checkouts'),
+    'db_pool_timeouts_total': ('counter', 'Checkouts that timed out waiting for a connection'),
+    'db_pool_wait_seconds_max': ('gauge', 'Longest checkout wait seen'),
+    'cache_hits_total': ('counter', 'Cache hits'),
+    'cache_misses_total': ('counter', 'Cache misses'),
+    'cache_entries': ('gauge', 'Entries currently cached'),
+    'cache_hit_ratio': ('gauge', 'hits / (hits + misses) since start'),
+}
+
+_lock = threading.Lock()
+_counters = {}
+_histograms = {}
+_in_flight = [0]
+
+def _labels(**labels):
+    return tuple(sorted(labels.items()))
+
+def _record(method, endpoint, status, seconds):
+    counter_key = ('http_requests_total', _labels(method=method, endpoint=endpoint, status=str(status)))
+    histogram_key = ('http_request_duration_seconds', _labels(method=method, endpoint=endpoint))
+    with _lock:
+        _counters[counter_key] = _counters.get(counter_key, 0) + 1
+        buckets = _histograms.get(histogram_key)
+        if buckets is None:
+            # per-bucket counts, then sum and count
+            buckets = _histograms[histogram_key] = [0] * (len(BUCKETS) + 2)
+        for i, bound in enumerate(BUCKETS):
+            if seconds <= bound:
+                buckets[i] += 1
+                break
+        buckets[-2] += seconds
+        buckets[-1] += 1
+
+def _endpoint():
+    return request.url_rule.rule if request.url_rule is not None else 'unmatched'
+
+def _start_request():
+    if request.path == '/metrics':
+        return
+    g._metrics_started = time.perf_counter()
+    with _lock:
+        _in_flight[0] += 1
+
+def _finish_request(response):
+    started = g.get('_metrics_started')
+    if started is not None:
+        g._metrics_recorded = True
+        _record(request.method, _endpoint(), response.status_code, time.perf_counter() - started)
+    return response
+
+def _teardown_request(exc):
+    started = g.pop('_metrics_started', None)
+    if started is None:
+        return
+    with _lock:
+        _in_flight[0] -= 1
+    # an unhandled exception skips after_request
+    if not g.pop('_metrics_recorded', False):
+        _record(request.method, _endpoint(), 500, time.perf_counter() - started)
+
+def _gauges_and_scraped_counters():
+    from app.cache import registry
+    from app.dbpool import TimedQueuePool
+    from app import db
+    gauges, counters = {}, {}
+    with _lock:
+        gauges[('http_requests_in_flight', ())] = _in_flight[0]
+    for key, engine in db.engines.items():
+        pool = engine.pool
+        labels = _labels(bind=key or 'default')
+        if not hasattr(pool, 'checkedout'):
+            continue
+        gauges[('db_pool_size', labels)] = pool.size()
+        gauges[('db_pool_checked_out', labels)] = pool.checkedout()
+        gauges[('db_pool_overflow', labels)] = max(pool.overflow(), 0)
+        if isinstance(pool, TimedQueuePool):
+            counters[('db_pool_checkouts_total', labels)] = pool.checkouts
+            counters[('db_pool_timeouts_total', labels)] = pool.timeouts
+            gauges[('db_pool_wait_seconds_max', labels)] = pool.wait_max
+    for name, stats in list(registry.items()):
+        data = stats()
+        labels = _labels(cache=name)
+        counters[('cache_hits_total', labels)] = data['hits']
+        counters[('cache_misses_total', labels)] = data['misses']
+        gauges[('cache_entries', labels)] = data['entries']
+    return gauges, counters
+
+def snapshot():
+    """This process's metrics as JSON-safe lists"""
+    gauges, scraped = _gauges_and_scraped_counters()
+    with _lock:
+        counters = dict(_counters)
+        histograms = {key: list(value) for key, value in _histograms.items()}
+    counters.update(scraped)
+    pack = lambda data: [[name, list(map(list, labels)), value] for (name, labels), value in data.items()]
+    return {
+        'pid': os.getpid(),
+        'counters': pack(counters),
+        'histograms': pack(histograms),
+        'gauges': pack(gauges)
+    }
+
+def _write_snapshot(directory, data=None):
+    data = data or snapshot()
+    path = os.path.join(directory, f"metrics_{data['pid']}.json")
+    tmp = f'{path}.tmp'
+    with open(tmp, 'w') as f:
+        json.dump(data, f)
+    os.replace(tmp, path)
+
+def _alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+def _unpack(rows):
+    return {(name, tuple(map(tuple, labels))): value for name, labels, value in rows}
+
+def collect():
+    """Merged (counters, histograms, gauges) across every worker sharing METRICS_DIR"""
+    local = snapshot()
+    snapshots = [local]
+    directory = current_app.config.get('METRICS_DIR')
+    if directory:
+        _write_snapshot(directory, local)
+        for path in glob.glob(os.path.join(directory, 'metrics_*.json')):
+            try:
+                with open(path) as f:
+                    data = json.load(f)
+            except (OSError, ValueError):
+                continue
+            if data.get('pid') != local['pid']:
+                snapshots.append(data)
+    counters, histograms, gauges = {}, {}, {}
+    for data in snapshots:
+        for key, value in _unpack(data['counters']).items():
+            counters[key] = counters.get(key, 0) + value
+        for key, value in _unpack(data['histograms']).items():
+            merged = histograms.setdefault(key, [0] * len(value))
+            for i, v in enumerate(value):
+                merged[i] += v
+        if data is local or _alive(data['pid']):
+            for key, value in _unpack(data['gauges']).items():
+                gauges[key] = gauges.get(key, 0) + value
+    for (name, labels), hits in list(counters.items()):
+        if name == 'cache_hits_total':
+            misses = counters.get(('cache_misses_total', labels), 0)
+            gauges[('cache_hit_ratio', labels)] = hits / (hits + misses) if hits + misses else 0
+    return counters, histograms, gauges
+
+def _format_labels(labels, extra=()):
+    pairs = list(labels) + list(extra)
+    if not pairs:
+        return ''
+    escaped = (str(v).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for _, v in pairs)
+    return '{' + ','.join(f'{k}="{v}"' for (k, _), v in zip(pairs, escaped)) + '}'
+
+def render():
+    counters, histograms, gauges = collect()
+    samples = {}
+    for (name, labels), value in list(counters.items()) + list(gauges.items()):
+        samples.setdefault(name, []).append(f'{name}{_format_labels(labels)} {value}')
+    for (name, labels), value in sorted(histograms.items()):
+        lines = samples.setdefault(name, [])
+        cumulative = 0
+        for bound, count in zip(BUCKETS, value):
+            cumulative += count
+            lines.append(f'{name}_bucket{_format_labels(labels, [("le", repr(bound))])} {cumulative}')
+        lines.append(f'{name}_bucket{_format_labels(labels, [("le", "+Inf")])} {value[-1]}')
+        lines.append(f'{name}_sum{_format_labels(labels)} {value[-2]}')
+        lines.append(f'{name}_count{_format_labels(labels)} {value[-1]}')
+    out = []
+    for name in sorted(samples):
+        kind, text = HELP.get(name, ('untyped', name))
+        out.append(f'# HELP {name} {text}')
+        out.append(f'# TYPE {name} {kind}')
+        # histogram buckets are already in bound order
+        out.extend(samples[name] if HELP.get(name, ('',))[0] == 'histogram' else sorted(samples[name]))
+    return '\n'.join(out) + '\n'
+
+def metrics_view():
+    return Response(render(), mimetype='text/plain; version=0.0.4')
+
+def _start_flusher(app, directory):
+    interval = app.config.get('METRICS_FLUSH_INTERVAL', 5)
+
+    def run():
+        while True:
+            time.sleep(interval)
+            try:
+                with app.app_context():
+                    _write_snapshot(directory)
+            except Exception:
+                logger.exception('Metrics flush failed')
+
+    threading.Thread(target=run, name='metrics-flush', daemon=True).start()
+
+    def final_flush():
+        try:
+            with app.app_context():
+                _write_snapshot(directory)
+        except Exception:
+            pass
+    atexit.register(final_flush)
+
+def init_app(app):
+    if not app.config.get('METRICS_ENABLED', True):
+        return
+    app.before_request(_start_request)
+    app.after_request(_finish_request)
+    app.teardown_request(_teardown_request)
+    app.add_url_rule('/metrics', 'metrics', metrics_view)
+    directory = app.config.get('METRICS_DIR')
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+        _start_flusher(app, directory)
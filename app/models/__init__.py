@@ -1,8 +1,10 @@
 from app.models.user import User
 from app.models.product import Product
 from app.models.stock import Stock
-from app.models.transaction import Transaction, TransactionItem
+from app.models.transaction import Transaction, TransactionItem, ArchivedTransaction, ArchivedTransactionItem
 from app.models.cart import Cart, CartItem
+from app.models.stock_movement import StockMovement, StockSnapshot
+from app.models.sales_rollup import DailySales, DailyProductSales, DailyCategorySales
 
 # Export semua model
 __all__ = [
@@ -11,6 +13,13 @@ __all__ = [
     'Stock',
     'Transaction',
     'TransactionItem',
+    'ArchivedTransaction',
+    'ArchivedTransactionItem',
     'Cart',
-    'CartItem'
+    'CartItem',
+    'StockMovement',
+    'StockSnapshot',
+    'DailySales',
+    'DailyProductSales',
+    'DailyCategorySales'
 ]
\ No newline at end of file
@@ -5,7 +5,8 @@ class Cart(db.Model):
     __tablename__ = 'carts'
     
     id = db.Column(db.BigInteger, primary_key=True, autoincrement=True)
-    user_id = db.Column(db.BigInteger, db.ForeignKey('users.id'), nullable=False)
+    # one cart per user
+    user_id = db.Column(db.BigInteger, db.ForeignKey('users.id'), nullable=False, unique=True, index=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow)
     
@@ -23,6 +24,11 @@ class CartItem(db.Model):
     product_id = db.Column(db.BigInteger, db.ForeignKey('products.id'), nullable=False)
     quantity = db.Column(db.Integer, nullable=False, default=1)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        # one line per product in a cart
+        db.Index('ix_cart_items_cart_id_product_id', 'cart_id', 'product_id', unique=True),
+    )
     
     def __repr__(self):
         return f'<CartItem {self.id}>'
\ No newline at end of file
@@ -17,6 +17,8 @@ class Product(db.Model):
     is_discounted = db.Column(db.Boolean, default=False)
     discount_percentage = db.Column(db.Float, default=0)
     rating = db.Column(db.Float, nullable=True)
+    # units sold in non-cancelled orders, maintained by app.rollups
+    sold_count = db.Column(db.Integer, nullable=False, default=0, server_default='0', index=True)
     specifications = db.Column(db.Text, nullable=True)
     weight = db.Column(db.String(100), nullable=True)
     type = db.Column(db.String(100), nullable=True)
@@ -35,6 +37,10 @@ class Product(db.Model):
     cart_items = db.relationship('CartItem', backref='product', lazy=True)
     transaction_items = db.relationship('TransactionItem', backref='product', lazy=True)
     
+    __table_args__ = (
+        db.Index('ix_products_category_is_available', 'category', 'is_available'),
+    )
+    
     def __repr__(self):
         return f'<Product {self.name}>'
 
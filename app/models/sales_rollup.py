@@ -0,0 +1,40 @@
+from app import db
+from datetime import datetime
+
+class DailySales(db.Model):
+    __tablename__ = 'daily_sales'
+
+    day = db.Column(db.Date, primary_key=True)
+    revenue = db.Column(db.Numeric(14, 2), nullable=False, default=0)
+    order_count = db.Column(db.Integer, nullable=False, default=0)
+    units = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def __repr__(self):
+        return f'<DailySales {self.day}>'
+
+class DailyProductSales(db.Model):
+    __tablename__ = 'daily_product_sales'
+
+    day = db.Column(db.Date, primary_key=True)
+    product_id = db.Column(db.BigInteger, db.ForeignKey('products.id'), primary_key=True)
+    revenue = db.Column(db.Numeric(14, 2), nullable=False, default=0)
+    order_count = db.Column(db.Integer, nullable=False, default=0)
+    units = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def __repr__(self):
+        return f'<DailyProductSales {self.day} {self.product_id}>'
+
+class DailyCategorySales(db.Model):
+    __tablename__ = 'daily_category_sales'
+
+    day = db.Column(db.Date, primary_key=True)
+    category = db.Column(db.String(100), primary_key=True)
+    revenue = db.Column(db.Numeric(14, 2), nullable=False, default=0)
+    order_count = db.Column(db.Integer, nullable=False, default=0)
+    units = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def __repr__(self):
+        return f'<DailyCategorySales {self.day} {self.category}>'
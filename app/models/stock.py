@@ -5,7 +5,8 @@ class Stock(db.Model):
     __tablename__ = 'stocks'
     
     id = db.Column(db.BigInteger, primary_key=True, autoincrement=True)
-    product_id = db.Column(db.BigInteger, db.ForeignKey('products.id'), nullable=False)
+    # one stock row per product
+    product_id = db.Column(db.BigInteger, db.ForeignKey('products.id'), nullable=False, unique=True, index=True)
     quantity = db.Column(db.Integer, nullable=False, default=0)
     min_stock = db.Column(db.Integer, default=10)
     last_restock = db.Column(db.DateTime, default=datetime.utcnow)
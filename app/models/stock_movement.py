@@ -0,0 +1,37 @@
+from app import db
+from datetime import datetime
+
+class StockMovement(db.Model):
+    """Append-only ledger entry; never update or delete rows in this table"""
+    __tablename__ = 'stock_movements'
+
+    id = db.Column(db.BigInteger, primary_key=True, autoincrement=True)
+    product_id = db.Column(db.BigInteger, db.ForeignKey('products.id'), nullable=False)
+    delta = db.Column(db.Integer, nullable=False)
+    reason = db.Column(db.String(50), nullable=False)
+    reference_id = db.Column(db.String(100), nullable=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        db.Index('ix_stock_movements_product_id_id', 'product_id', 'id'),
+    )
+
+    def __repr__(self):
+        return f'<StockMovement {self.product_id}: {self.delta:+d} {self.reason}>'
+
+class StockSnapshot(db.Model):
+    """Ledger balance of a product up to and including last_movement_id"""
+    __tablename__ = 'stock_snapshots'
+
+    id = db.Column(db.BigInteger, primary_key=True, autoincrement=True)
+    product_id = db.Column(db.BigInteger, db.ForeignKey('products.id'), nullable=False)
+    quantity = db.Column(db.Integer, nullable=False)
+    last_movement_id = db.Column(db.BigInteger, nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        db.Index('ix_stock_snapshots_product_id_id', 'product_id', 'id'),
+    )
+
+    def __repr__(self):
+        return f'<StockSnapshot {self.product_id}: {self.quantity}>'
@@ -17,6 +17,15 @@ class Transaction(db.Model):
     
     # Relationships
     items = db.relationship('TransactionItem', backref='transaction', lazy=True)
+
+    __table_args__ = (
+        # keyset pagination for the admin order list
+        db.Index('ix_transactions_created_at_id', 'created_at', 'id'),
+        # per-customer order history, newest first
+        db.Index('ix_transactions_user_id_created_at', 'user_id', 'created_at'),
+        # never hand out an id again once it has moved to transactions_archive
+        {'sqlite_autoincrement': True},
+    )
     
     def __repr__(self):
         return f'<Transaction {self.transaction_code}>'
@@ -25,12 +34,52 @@ class TransactionItem(db.Model):
     __tablename__ = 'transaction_items'
     
     id = db.Column(db.BigInteger, primary_key=True, autoincrement=True)
-    transaction_id = db.Column(db.BigInteger, db.ForeignKey('transactions.id'), nullable=False)
+    transaction_id = db.Column(db.BigInteger, db.ForeignKey('transactions.id'), nullable=False, index=True)
     product_id = db.Column(db.BigInteger, db.ForeignKey('products.id'), nullable=False)
     quantity = db.Column(db.Integer, nullable=False)
     price = db.Column(db.Numeric(10, 2), nullable=False)
     subtotal = db.Column(db.Numeric(12, 2), nullable=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    __table_args__ = ({'sqlite_autoincrement': True},)
     
     def __repr__(self):
-        return f'<TransactionItem {self.id}>'
\ No newline at end of file
+        return f'<TransactionItem {self.id}>'
+
+class ArchivedTransaction(db.Model):
+    """Completed or cancelled order moved out of `transactions` by app/archive.py; same id"""
+    __tablename__ = 'transactions_archive'
+
+    id = db.Column(db.BigInteger, primary_key=True, autoincrement=False)
+    transaction_code = db.Column(db.String(50), unique=True, nullable=False)
+    user_id = db.Column(db.BigInteger, nullable=False)
+    total_amount = db.Column(db.Numeric(12, 2), nullable=False)
+    status = db.Column(db.String(50))
+    payment_method = db.Column(db.String(100), nullable=True)
+    shipping_address = db.Column(db.Text, nullable=False)
+    notes = db.Column(db.Text, nullable=True)
+    created_at = db.Column(db.DateTime)
+    updated_at = db.Column(db.DateTime)
+    archived_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        db.Index('ix_transactions_archive_created_at_id', 'created_at', 'id'),
+        db.Index('ix_transactions_archive_user_id_created_at', 'user_id', 'created_at'),
+    )
+
+    def __repr__(self):
+        return f'<ArchivedTransaction {self.transaction_code}>'
+
+class ArchivedTransactionItem(db.Model):
+    __tablename__ = 'transaction_items_archive'
+
+    id = db.Column(db.BigInteger, primary_key=True, autoincrement=False)
+    transaction_id = db.Column(db.BigInteger, nullable=False, index=True)
+    product_id = db.Column(db.BigInteger, nullable=False)
+    quantity = db.Column(db.Integer, nullable=False)
+    price = db.Column(db.Numeric(10, 2), nullable=False)
+    subtotal = db.Column(db.Numeric(12, 2), nullable=False)
+    created_at = db.Column(db.DateTime)
+
+    def __repr__(self):
+        return f'<ArchivedTransactionItem {self.id}>'
@@ -1,6 +1,6 @@
 from app import db
 from datetime import datetime
-from werkzeug.security import generate_password_hash, check_password_hash
+from app import passwords
 
 class User(db.Model):
     __tablename__ = 'users'
@@ -25,12 +25,21 @@ class User(db.Model):
     
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        # admin user list filtered by role or verification, paged by id
+        db.Index('ix_users_is_admin_id', 'is_admin', 'id'),
+        db.Index('ix_users_is_verified_id', 'is_verified', 'id'),
+    )
     
     def __repr__(self):
         return f'<User {self.username}>'
     
     def set_password(self, password):
-        self.password_hash = generate_password_hash(password)
+        self.password_hash = passwords.hash_password(password)
     
     def check_password(self, password):
-        return check_password_hash(self.password_hash, password)
\ No newline at end of file
+        return passwords.verify_password(self.password_hash, password)
+
+    def password_needs_rehash(self):
+        return passwords.needs_rehash(self.password_hash)
\ No newline at end of file
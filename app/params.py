@@ -0,0 +1,30 @@
+import base64
+from datetime import datetime, timedelta, timezone
+
+def parse_datetime(value, is_end=False):
+    """ISO date or datetime query arg; a bare date as an end bound covers that whole day.
+
+    Values with a UTC offset are converted to naive UTC, like the stored timestamps.
+    """
+    value = value.strip()
+    parsed = datetime.fromisoformat(value)
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    if is_end and len(value) <= 10:
+        parsed += timedelta(days=1)
+    return parsed
+
+def encode_cursor(*values):
+    raw = '|'.join(v.isoformat() if isinstance(v, datetime) else str(v) for v in values)
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii').rstrip('=')
+
+def decode_cursor(token, parts):
+    """Inverse of encode_cursor; raises ValueError on a malformed token"""
+    try:
+        raw = base64.urlsafe_b64decode(token + '=' * (-len(token) % 4)).decode('utf-8')
+    except Exception:
+        raise ValueError('Invalid cursor')
+    values = raw.split('|')
+    if len(values) != parts:
+        raise ValueError('Invalid cursor')
+    return values
@@ -0,0 +1,60 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+from werkzeug.security import generate_password_hash, check_password_hash
+
+class PasswordPoolBusy(Exception):
+    """Raised when every hashing worker is busy and the wait queue is full"""
+
+_executor = None
+_slots = None
+_method = 'scrypt:32768:8:1'
+_timeout = 10
+_method_prefix = None
+
+def init_app(app):
+    """Size the worker pool and hash parameters from the app config"""
+    global _executor, _slots, _method, _timeout, _method_prefix
+    workers = app.config.get('PASSWORD_HASH_WORKERS', 2)
+    if _executor is not None:
+        _executor.shutdown(wait=False)
+    _executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='password-hash')
+    _slots = threading.BoundedSemaphore(workers + app.config.get('PASSWORD_HASH_QUEUE', 32))
+    _method = app.config.get('PASSWORD_HASH_METHOD', _method)
+    _timeout = app.config.get('PASSWORD_HASH_TIMEOUT', _timeout)
+    _method_prefix = None
+
+def _run(fn, *args):
+    # hashlib releases the GIL while hashing, so the pool caps how many cores
+    # password work can take without stalling the request threads
+    if _executor is None:
+        return fn(*args)
+    if not _slots.acquire(timeout=_timeout):
+        raise PasswordPoolBusy('Password hashing is saturated, retry shortly')
+    try:
+        future = _executor.submit(fn, *args)
+    except Exception:
+        _slots.release()
+        raise
+    future.add_done_callback(lambda _: _slots.release())
+    try:
+        return future.result(timeout=_timeout)
+    except FutureTimeout:
+        # the hash keeps its slot until it finishes; the caller just stops waiting
+        raise PasswordPoolBusy('Password hashing is saturated, retry shortly')
+
+def hash_password(password):
+    return _run(generate_password_hash, password, _method)
+
+def verify_password(password_hash, password):
+    return _run(check_password_hash, password_hash, password)
+
+def needs_rehash(password_hash):
+    """True when the stored hash was made with other parameters than PASSWORD_HASH_METHOD"""
+    global _method_prefix
+    if not password_hash:
+        return False
+    if _method_prefix is None:
+        # werkzeug expands defaults (e.g. "scrypt" -> "scrypt:32768:8:1"), so
+        # read the canonical prefix back from a real hash
+        _method_prefix = generate_password_hash('', _method).split('$', 1)[0]
+    return password_hash.split('$', 1)[0] != _method_prefix
@@ -0,0 +1,80 @@
+"""Per-request SQL statement counts and DB time.
+
+Every response gets X-Query-Count and a Server-Timing header with db and
+total durations. When one statement shape (the parameterized SQL text) runs
+more than NPLUSONE_THRESHOLD times in a request, that is logged as a likely
+N+1. With NPLUSONE_STRICT on, an NPlusOneError is raised instead, so a test
+client sees the failure.
+"""
+import time
+from collections import Counter
+from flask import current_app, g, has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+class NPlusOneError(Exception):
+    pass
+
+class QueryStats:
+    __slots__ = ('count', 'db_time', 'shapes', 'started')
+
+    def __init__(self):
+        self.count = 0
+        self.db_time = 0.0
+        self.shapes = Counter()
+        self.started = time.perf_counter()
+
+    def repeated(self, threshold):
+        """(statement, executions) pairs above threshold, worst first"""
+        return [(shape, n) for shape, n in self.shapes.most_common() if n > threshold]
+
+def current_stats():
+    if has_request_context():
+        return g.get('_query_stats')
+    return None
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if current_stats() is not None:
+        conn.info.setdefault('query_stats_start', []).append(time.perf_counter())
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = current_stats()
+    if stats is None:
+        return
+    starts = conn.info.get('query_stats_start')
+    if starts:
+        stats.db_time += time.perf_counter() - starts.pop()
+    stats.count += 1
+    stats.shapes[statement] += 1
+
+def _start_request():
+    g._query_stats = QueryStats()
+
+def _finish_request(response):
+    stats = g.pop('_query_stats', None)
+    if stats is None:
+        return response
+    total_ms = (time.perf_counter() - stats.started) * 1000
+    response.headers['X-Query-Count'] = str(stats.count)
+    response.headers['Server-Timing'] = (
+        f'db;dur={stats.db_time * 1000:.2f};desc="{stats.count} queries", total;dur={total_ms:.2f}'
+    )
+    repeated = stats.repeated(current_app.config.get('NPLUSONE_THRESHOLD', 10))
+    if repeated:
+        shape, executions = repeated[0]
+        message = (f"N+1 suspected in {request.method} {request.path}: "
+                   f"{executions} executions of {' '.join(shape.split())[:200]}")
+        if current_app.config.get('NPLUSONE_STRICT'):
+            raise NPlusOneError(message)
+        current_app.logger.warning(message)
+    return response
+
+def init_app(app):
+    if not app.config.get('QUERY_STATS_ENABLED', True):
+        return
+    # on the Engine class, so replica binds are covered too
+    if not event.contains(Engine, 'before_cursor_execute', _before_cursor_execute):
+        event.listen(Engine, 'before_cursor_execute', _before_cursor_execute)
+        event.listen(Engine, 'after_cursor_execute', _after_cursor_execute)
+    app.before_request(_start_request)
+    app.after_request(_finish_request)
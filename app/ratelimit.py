@@ -0,0 +1,143 @@
+import math
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from functools import wraps
+from flask import g, jsonify, request
+
+def _refill(tokens, updated, now, capacity, rate):
+    return min(capacity, tokens + (now - updated) * rate)
+
+def _take(tokens, capacity, rate, cost):
+    """Return (allowed, tokens_left, retry_after) for a refilled bucket"""
+    if tokens >= cost:
+        return True, tokens - cost, 0
+    return False, tokens, (cost - tokens) / rate
+
+class BucketStore(ABC):
+    """Token bucket state. Subclass for a shared backend (Redis, memcached, ...)"""
+
+    @abstractmethod
+    def take(self, key, capacity, rate, cost=1):
+        """Consume `cost` tokens; return (allowed, retry_after_seconds)"""
+
+class MemoryStore(BucketStore):
+    """Per-process buckets; the default for single-node deployments"""
+
+    def __init__(self, max_keys=100000):
+        self.max_keys = max_keys
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+
+    def take(self, key, capacity, rate, cost=1):
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated = self._buckets.pop(key, (capacity, now))
+            tokens = _refill(tokens, updated, now, capacity, rate)
+            allowed, tokens, retry_after = _take(tokens, capacity, rate, cost)
+            self._buckets[key] = (tokens, now)
+            # least recently seen keys are the ones with full buckets anyway
+            while len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        return allowed, retry_after
+
+class SQLiteStore(BucketStore):
+    """Buckets in a SQLite file shared by every worker process on the host.
+
+    Local stand-in for a networked store: it exercises the same shared-state
+    path without requiring Redis in development or single-host deployments.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        with self._connect() as conn:
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS rate_limit_buckets '
+                '(key TEXT PRIMARY KEY, tokens REAL NOT NULL, updated REAL NOT NULL)'
+            )
+
+    def _connect(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            self._local.conn = conn
+        return conn
+
+    def take(self, key, capacity, rate, cost=1):
+        now = time.time()
+        conn = self._connect()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            row = conn.execute(
+                'SELECT tokens, updated FROM rate_limit_buckets WHERE key = ?', (key,)
+            ).fetchone()
+            tokens = _refill(row[0], row[1], now, capacity, rate) if row else capacity
+            allowed, tokens, retry_after = _take(tokens, capacity, rate, cost)
+            conn.execute(
+                'INSERT OR REPLACE INTO rate_limit_buckets (key, tokens, updated) VALUES (?, ?, ?)',
+                (key, tokens, now)
+            )
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+        return allowed, retry_after
+
+_store = MemoryStore()
+_limits = {}
+_enabled = True
+
+def parse_limit(value):
+    """'10/60' -> burst of 10 tokens refilled at 10 per 60 seconds"""
+    capacity, _, period = str(value).partition('/')
+    capacity = float(capacity)
+    return capacity, capacity / float(period or 1)
+
+def init_app(app):
+    global _store, _enabled
+    _enabled = app.config.get('RATELIMIT_ENABLED', True)
+    storage = app.config.get('RATELIMIT_STORAGE', 'memory')
+    if isinstance(storage, BucketStore):
+        _store = storage
+    elif storage.startswith('sqlite:///'):
+        _store = SQLiteStore(storage[len('sqlite:///'):])
+    else:
+        _store = MemoryStore()
+    _limits.clear()
+    for name, value in app.config.get('RATELIMITS', {}).items():
+        _limits[name] = parse_limit(value)
+
+def _client_key(scope):
+    ip = request.remote_addr or 'unknown'
+    principal = g.get('principal')
+    user = str(principal.id) if principal else None
+    if scope == 'user':
+        return f"user:{user}" if user else f"ip:{ip}"
+    if scope == 'ip_user':
+        return f"ip:{ip}|user:{user}"
+    return f"ip:{ip}"
+
+def rate_limit(name, scope='ip'):
+    """Throttle a view with the token bucket configured under RATELIMITS[name].
+
+    scope is 'ip', 'user' (falls back to ip for anonymous callers) or 'ip_user'.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapped(*args, **kwargs):
+            limit = _limits.get(name)
+            if _enabled and limit:
+                capacity, rate = limit
+                allowed, retry_after = _store.take(f"{name}:{_client_key(scope)}", capacity, rate)
+                if not allowed:
+                    retry_after = max(1, math.ceil(retry_after))
+                    return jsonify({
+                        'status': 'error',
+                        'message': f'Too many requests, retry in {retry_after} seconds'
+                    }), 429, {'Retry-After': str(retry_after)}
+            return view(*args, **kwargs)
+        return wrapped
+    return decorator
@@ -1,9 +1,11 @@
 from flask import jsonify, make_response
-def ok(values, message):
+def ok(values, message, **meta):
+    """meta (e.g. pagination fields) goes next to data"""
     res = {
         'data': values,
         'message': message,
-        'status': 'success'
+        'status': 'success',
+        **meta
     }
     return make_response(jsonify(res)), 200
 
@@ -37,4 +39,12 @@ def server_error(values, message):
         'message': message,
         'status': 'error'
     }
-    return make_response(jsonify(res)), 500
\ No newline at end of file
+    return make_response(jsonify(res)), 500
+
+def service_unavailable(values, message, retry_after=1):
+    res = {
+        'data': values,
+        'message': message,
+        'status': 'error'
+    }
+    return make_response(jsonify(res), {'Retry-After': str(retry_after)}), 503
\ No newline at end of file
@@ -0,0 +1,159 @@
+from datetime import datetime
+from decimal import Decimal
+from sqlalchemy.exc import IntegrityError
+from app import db
+from app.models.product import Product
+from app.models.transaction import TransactionItem
+from app import archive
+from app.models.sales_rollup import DailySales, DailyProductSales, DailyCategorySales
+
+UNCATEGORIZED = 'uncategorized'
+
+def counts_toward_sales(status):
+    return status != 'cancelled'
+
+def _bump(model, keys, revenue, orders, units):
+    values = {
+        model.revenue: model.revenue + revenue,
+        model.order_count: model.order_count + orders,
+        model.units: model.units + units,
+        model.updated_at: datetime.utcnow()
+    }
+    query = db.session.query(model).filter_by(**keys)
+    if query.update(values, synchronize_session=False):
+        return
+    try:
+        with db.session.begin_nested():
+            db.session.add(model(revenue=revenue, order_count=orders, units=units, **keys))
+    except IntegrityError:
+        # another order created the row first
+        query.update(values, synchronize_session=False)
+
+def _bump_sold_count(product_id, units):
+    db.session.query(Product).filter(Product.id == product_id).update(
+        {Product.sold_count: Product.sold_count + units}, synchronize_session=False
+    )
+
+def apply_transaction(transaction, sign=1):
+    """Add (sign=1) or remove (sign=-1) one order's contribution to the rollups
+    and to Product.sold_count.
+
+    Runs inside the caller's transaction, so the rollups commit or roll back
+    together with the order write. Items must already be flushed.
+    """
+    day = (transaction.created_at or datetime.utcnow()).date()
+    lines = db.session.query(
+        TransactionItem.product_id,
+        Product.category,
+        TransactionItem.quantity,
+        TransactionItem.subtotal
+    ).outerjoin(
+        Product, Product.id == TransactionItem.product_id
+    ).filter(TransactionItem.transaction_id == transaction.id).all()
+
+    by_product = {}
+    by_category = {}
+    total_units = 0
+    for product_id, category, quantity, subtotal in lines:
+        subtotal = Decimal(str(subtotal or 0))
+        for bucket, key in ((by_product, product_id), (by_category, category or UNCATEGORIZED)):
+            revenue, units = bucket.get(key, (Decimal('0'), 0))
+            bucket[key] = (revenue + subtotal, units + quantity)
+        total_units += quantity
+
+    _bump(DailySales, {'day': day},
+          sign * Decimal(str(transaction.total_amount or 0)), sign, sign * total_units)
+    for product_id, (revenue, units) in by_product.items():
+        _bump(DailyProductSales, {'day': day, 'product_id': product_id},
+              sign * revenue, sign, sign * units)
+        _bump_sold_count(product_id, sign * units)
+    for category, (revenue, units) in by_category.items():
+        _bump(DailyCategorySales, {'day': day, 'category': category},
+              sign * revenue, sign, sign * units)
+
+def apply_status_change(transaction, old_status, new_status):
+    was_counted = counts_toward_sales(old_status)
+    is_counted = counts_toward_sales(new_status)
+    if was_counted and not is_counted:
+        apply_transaction(transaction, -1)
+    elif is_counted and not was_counted:
+        apply_transaction(transaction, 1)
+
+def _sold_units():
+    """Units sold per Product row, live and archived orders added up"""
+    total = None
+    for T, I in archive.PAIRS:
+        units = db.select(db.func.coalesce(db.func.sum(I.quantity), 0)).join(
+            T, T.id == I.transaction_id
+        ).where(
+            I.product_id == Product.id,
+            T.status != 'cancelled'
+        ).scalar_subquery()
+        total = units if total is None else total + units
+    return total
+
+def _order_rows(T, I):
+    units = db.select(
+        I.transaction_id,
+        db.func.sum(I.quantity).label('units')
+    ).group_by(I.transaction_id).subquery()
+    return db.select(
+        T.id,
+        T.created_at,
+        T.total_amount,
+        db.func.coalesce(units.c.units, 0).label('units')
+    ).outerjoin(units, units.c.transaction_id == T.id).where(T.status != 'cancelled')
+
+def _line_rows(T, I):
+    return db.select(
+        T.created_at,
+        I.transaction_id,
+        I.product_id,
+        I.subtotal,
+        I.quantity
+    ).join(T, T.id == I.transaction_id).where(T.status != 'cancelled')
+
+def rebuild():
+    """Recompute every rollup row and Product.sold_count from the live and archived orders"""
+    db.session.query(DailySales).delete(synchronize_session=False)
+    db.session.query(DailyProductSales).delete(synchronize_session=False)
+    db.session.query(DailyCategorySales).delete(synchronize_session=False)
+
+    orders = archive.union_all(_order_rows)
+    day = db.func.date(orders.c.created_at)
+    db.session.execute(db.insert(DailySales).from_select(
+        ['day', 'revenue', 'order_count', 'units'],
+        db.select(
+            day,
+            db.func.sum(orders.c.total_amount),
+            db.func.count(orders.c.id),
+            db.func.sum(orders.c.units)
+        ).group_by(day)
+    ))
+    lines = archive.union_all(_line_rows)
+    day = db.func.date(lines.c.created_at)
+    db.session.execute(db.insert(DailyProductSales).from_select(
+        ['day', 'product_id', 'revenue', 'order_count', 'units'],
+        db.select(
+            day,
+            lines.c.product_id,
+            db.func.sum(lines.c.subtotal),
+            db.func.count(db.distinct(lines.c.transaction_id)),
+            db.func.sum(lines.c.quantity)
+        ).group_by(day, lines.c.product_id)
+    ))
+    category = db.func.coalesce(Product.category, UNCATEGORIZED)
+    db.session.execute(db.insert(DailyCategorySales).from_select(
+        ['day', 'category', 'revenue', 'order_count', 'units'],
+        db.select(
+            day,
+            category,
+            db.func.sum(lines.c.subtotal),
+            db.func.count(db.distinct(lines.c.transaction_id)),
+            db.func.sum(lines.c.quantity)
+        ).select_from(lines.outerjoin(Product, Product.id == lines.c.product_id))
+        .group_by(day, category)
+    ))
+    db.session.execute(db.update(Product).values(sold_count=_sold_units()))
+    db.session.commit()
+    return db.session.query(db.func.count()).select_from(DailySales).scalar()
@@ -1,11 +1,19 @@
 from flask import Blueprint, jsonify, request
 from datetime import datetime
+import logging
 import random
 import string
 import os
 from werkzeug.utils import secure_filename
+from flask import current_app, g
+from app.auth import load_principal, login_required, admin_required
+from app.passwords import PasswordPoolBusy
+from app.ratelimit import rate_limit
+from app.cache import on_commit
 
+logger = logging.getLogger(__name__)
 bp = Blueprint('api', __name__)
+bp.before_request(load_principal)
 UPLOAD_FOLDER = 'static/img/products'
 ALLOWED_EXTENSIONS = {'png', 'jpg', 'jpeg', 'gif', 'webp'}
 def allowed_file(filename):
@@ -30,12 +38,12 @@ def test():
         'testing_steps': [
             '1. POST /users - Register admin user (set is_admin: true)',
             '2. POST /login - Login as admin',
-            '3. Save admin ID from response',
+            '3. Save admin token from response',
             '4. POST /users - Register customer user',
             '5. POST /login - Login as customer',
-            '6. Save customer ID from response',
-            '7. Use admin ID in header (X-User-ID) to create products',
-            '8. Use customer ID to test cart functionality',
+            '6. Save customer token from response',
+            '7. Use admin token in header (Authorization: Bearer <token>) to create products',
+            '8. Use customer token to test cart functionality',
             '9. POST /logout - Logout current user'
         ],
         'endpoints': {
@@ -45,14 +53,15 @@ def test():
                 'POST /users - Register'
             ],
             'USERS': [
-                'GET /users - Get all users (admin only)',
+                'GET /users - Users by id, paginated (q, is_admin, is_verified, cursor, include=address; admin only)',
                 'GET /users/<id> - Get user by ID',
                 'POST /users - Create user',
                 'PUT /users/<id> - Update user',
                 'DELETE /users/<id> - Delete user (admin only)'
             ],
             'PRODUCTS': [
-                'GET /products - Get all products',
+                'GET /products - Get all products (sort=best_selling)',
+                'GET /products/best-sellers - Top products by units sold',
                 'GET /products/<id> - Get product by ID',
                 'POST /products - Create product (admin only)',
                 'PUT /products/<id> - Update product (admin only)',
@@ -60,8 +69,14 @@ def test():
             ],
             'ADMIN': [
                 'GET /admin/dashboard - Admin dashboard',
+                'GET /admin/db/pool - Database connection pool stats',
                 'GET /admin/users - All users (admin view)',
-                'GET /admin/transactions - All transactions (admin view)'
+                'GET /admin/transactions - All transactions (admin view, archived=1 for the archive)',
+                'GET /admin/analytics/top-sellers - Best selling products in a date range',
+                'GET /admin/analytics/revenue - Revenue time series (interval=day|week|month)',
+                'GET /admin/analytics/basket - Average basket size and value',
+                'GET /admin/analytics/category-mix - Revenue share per category',
+                'GET /admin/transactions/export - Stream orders as CSV or JSONL (format, start, end, status, gzip)'
             ],
             'CART': [
                 'GET /cart - Get user cart',
@@ -69,15 +84,22 @@ def test():
                 'PUT /cart/update/<id> - Update cart item',
                 'DELETE /cart/remove/<id> - Remove from cart',
                 'POST /cart/checkout - Checkout'
+            ],
+            'HEALTH': [
+                'GET /health - Overall status (503 when the database is unreachable)',
+                'GET /health/live - Liveness, no database access',
+                'GET /health/ready - Readiness: cached SELECT 1 plus pool saturation'
             ]
         }
     })
 
 @bp.route('/login', methods=['POST'])
+@rate_limit('login', scope='ip')
 def login():
     try:
         from app.models.user import User
-        from app import response
+        from app.auth import issue_token
+        from app import db
         data = request.json
         if not data or 'password' not in data or ('email' not in data and 'username' not in data):
             return jsonify({
@@ -91,6 +113,14 @@ def login():
         else:
             user = User.query.filter_by(username=data.get('username')).first()
         if user and user.check_password(data['password']):
+            if user.password_needs_rehash():
+                try:
+                    user.set_password(data['password'])
+                    db.session.commit()
+                except Exception:
+                    # the login itself still succeeds; the hash is upgraded next time
+                    db.session.rollback()
+                    logger.exception('password rehash failed')
             user_data = {
                 'id': user.id,
                 'username': user.username,
@@ -105,13 +135,20 @@ def login():
                 'success': True,
                 'message': 'Login successful',
                 'user': user_data,
-                'token': f'mock-jwt-token-{user.id}'
+                'token': issue_token(user),
+                'token_type': 'Bearer',
+                'expires_in': current_app.config['AUTH_TOKEN_TTL']
             })
         else:
             return jsonify({
                 'success': False,
                 'message': 'Invalid email/username or password'
             }), 401
+    except PasswordPoolBusy as e:
+        return jsonify({
+            'success': False,
+            'message': str(e)
+        }), 503, {'Retry-After': '1'}
     except Exception as e:
         return jsonify({
             'success': False,
@@ -119,21 +156,9 @@ def login():
         }), 500
 
 @bp.route('/users', methods=['GET'])
+@admin_required
 def get_users():
     try:
-        user_id = request.headers.get('X-User-ID')
-        if not user_id:
-            return jsonify({
-                'status': 'error',
-                'message': 'X-User-ID header is required'
-            }), 401
-        from app.models.user import User
-        user = User.query.get(int(user_id))
-        if not user or not user.is_admin:
-            return jsonify({
-                'status': 'error',
-                'message': 'Admin access required'
-            }), 403
         from app.controllers.UserController import index
         result = index()
         return result
@@ -144,6 +169,7 @@ def get_users():
         }), 500
 
 @bp.route('/users', methods=['POST'])
+@rate_limit('register', scope='ip')
 def create_user():
     try:
         from app.controllers.UserController import store
@@ -173,16 +199,14 @@ def logout():
     For now, we'll just provide a success response for client-side cleanup
     """
     try:
-        user_id = request.headers.get('X-User-ID')
-        if not user_id:
+        if not g.auth_attempted:
             return jsonify({
                 'status': 'success',
                 'message': 'Logged out (no active session)'
             })
-        from app.models.user import User
-        user = User.query.get(int(user_id))
+        user = g.principal
         if user:
-            print(f"User {user.username} (ID: {user.id}) logged out at {datetime.utcnow()}")
+            logger.info('User logged out', extra={'user_id': user.id, 'username': user.username})
         return jsonify({
             'status': 'success',
             'message': 'Successfully logged out',
@@ -200,15 +224,11 @@ def logout():
 @bp.route('/products/<int:id>', methods=['GET'])
 def get_product(id):
     try:
-        requester_id = request.headers.get('X-User-ID')
-        if requester_id:
-            from app.models.user import User
-            requester = User.query.get(int(requester_id))
-            if not requester:
-                return jsonify({
-                    'status': 'error',
-                    'message': 'Invalid user'
-                }), 401
+        if g.auth_attempted and g.principal is None:
+            return jsonify({
+                'status': 'error',
+                'message': 'Invalid user'
+            }), 401
         from app.models.product import Product
         product = Product.query.get(id)
         if not product:
@@ -226,28 +246,11 @@ def get_product(id):
 
 
 @bp.route('/users/<int:id>', methods=['PUT'])
+@login_required
 def update_user(id):
     try:
-        requester_id = request.headers.get('X-User-ID')
-        if not requester_id:
-            return jsonify({
-                'status': 'error',
-                'message': 'Authentication required'
-            }), 401
-        from app.models.user import User
-        requester = User.query.get(int(requester_id))
-        if not requester:
-            return jsonify({
-                'status': 'error',
-                'message': 'Invalid user'
-            }), 401
-        target_user = User.query.get(id)
-        if not target_user:
-            return jsonify({
-                'status': 'error',
-                'message': f'User with ID {id} not found'
-            }), 404
-        if requester.id != target_user.id and not requester.is_admin:
+        requester = g.principal
+        if requester.id != id and not requester.is_admin:
             return jsonify({
                 'status': 'error',
                 'message': 'Can only update your own profile'
@@ -261,22 +264,10 @@ def update_user(id):
         }), 500
 
 @bp.route('/users/<int:id>', methods=['DELETE'])
+@admin_required
 def delete_user(id):
     try:
-        admin_id = request.headers.get('X-User-ID')
-        if not admin_id:
-            return jsonify({
-                'status': 'error',
-                'message': 'Authentication required'
-            }), 401
-        from app.models.user import User
-        admin = User.query.get(int(admin_id))
-        if not admin or not admin.is_admin:
-            return jsonify({
-                'status': 'error',
-                'message': 'Admin access required'
-            }), 403
-        if admin.id == id:
+        if g.principal.id == id:
             return jsonify({
                 'status': 'error',
                 'message': 'Cannot delete yourself'
@@ -300,22 +291,21 @@ def get_products():
             'message': f'Get products error: {str(e)}'
         }), 500
 
+@bp.route('/products/best-sellers', methods=['GET'])
+def get_best_sellers():
+    try:
+        from app.controllers.ProductController import best_sellers
+        return best_sellers()
+    except Exception as e:
+        return jsonify({
+            'status': 'error',
+            'message': f'Get best sellers error: {str(e)}'
+        }), 500
+
 @bp.route('/products', methods=['POST'])
+@admin_required
 def create_product():
     try:
-        user_id = request.headers.get('X-User-ID')
-        if not user_id:
-            return jsonify({
-                'status': 'error',
-                'message': 'X-User-ID header is required'
-            }), 401
-        from app.models.user import User
-        user = User.query.get(int(user_id))
-        if not user or not user.is_admin:
-            return jsonify({
-                'status': 'error',
-                'message': 'Admin access required'
-            }), 403
         from app.controllers.ProductController import store
         return store()
     except Exception as e:
@@ -325,21 +315,9 @@ def create_product():
         }), 500
 
 @bp.route('/products/<int:id>', methods=['PUT'])
+@admin_required
 def update_product(id):
     try:
-        user_id = request.headers.get('X-User-ID')
-        if not user_id:
-            return jsonify({
-                'status': 'error',
-                'message': 'X-User-ID header is required'
-            }), 401
-        from app.models.user import User
-        user = User.query.get(int(user_id))
-        if not user or not user.is_admin:
-            return jsonify({
-                'status': 'error',
-                'message': 'Admin access required'
-            }), 403
         from app.controllers.ProductController import update
         return update(id)
     except Exception as e:
@@ -349,21 +327,9 @@ def update_product(id):
         }), 500
 
 @bp.route('/products/<int:id>', methods=['DELETE'])
+@admin_required
 def delete_product(id):
     try:
-        user_id = request.headers.get('X-User-ID')
-        if not user_id:
-            return jsonify({
-                'status': 'error',
-                'message': 'Authentication required'
-            }), 401
-        from app.models.user import User
-        user = User.query.get(int(user_id))
-        if not user or not user.is_admin:
-            return jsonify({
-                'status': 'error',
-                'message': 'Admin access required'
-            }), 403
         from app.models.product import Product
         from app import db
         product = Product.query.get(id)
@@ -382,8 +348,10 @@ def delete_product(id):
             else:
                 product_name = product.name
                 from app.models.stock import Stock
+                from app.controllers.StockController import record_movement
                 stock = Stock.query.filter_by(product_id=id).first()
                 if stock:
+                    record_movement(id, -stock.quantity, 'stock_deleted', stock=stock)
                     db.session.delete(stock)
                 db.session.delete(product)
                 db.session.commit()
@@ -416,22 +384,10 @@ def delete_product(id):
         }), 500
     
 @bp.route('/products/<int:id>/activate', methods=['PUT'])
+@admin_required
 def activate_product(id):
     """Reactivate a deactivated product (admin only)"""
     try:
-        user_id = request.headers.get('X-User-ID')
-        if not user_id:
-            return jsonify({
-                'status': 'error',
-                'message': 'Authentication required'
-            }), 401
-        from app.models.user import User
-        user = User.query.get(int(user_id))
-        if not user or not user.is_admin:
-            return jsonify({
-                'status': 'error',
-                'message': 'Admin access required'
-            }), 403
         from app.models.product import Product
         from app import db
         product = Product.query.get(id)
@@ -483,56 +439,16 @@ def activate_product(id):
         }), 500
 
 @bp.route('/admin/dashboard', methods=['GET'])
+@admin_required
 def admin_dashboard():
     try:
-        user_id = request.headers.get('X-User-ID')
-        if not user_id:
-            return jsonify({
-                'status': 'error',
-                'message': 'X-User-ID header is required'
-            }), 401
-        from app.models.user import User
-        user = User.query.get(int(user_id))
-        if not user or not user.is_admin:
-            return jsonify({
-                'status': 'error',
-                'message': 'Admin access required'
-            }), 403
-        from app.models.product import Product
-        from app.models.transaction import Transaction
-        from app.models.stock import Stock
-        total_users = User.query.count()
-        try:
-            total_products = Product.query.count()  
-        except:
-            total_products = Product.query.filter_by(is_available=True).count() if hasattr(Product, 'is_available') else Product.query.count()
-        total_transactions = Transaction.query.count()
-        today = datetime.utcnow().date()
-        today_start = datetime(today.year, today.month, today.day)
-        today_transactions = Transaction.query.filter(
-            Transaction.created_at >= today_start
-        ).count()
-        low_stocks = 0
-        try:
-            low_stocks = Stock.query.filter(Stock.quantity <= Stock.min_stock).count()
-        except:
-            pass
-        from app import db
-        total_revenue_result = db.session.query(db.func.sum(Transaction.total_amount)).scalar()
-        total_revenue = float(total_revenue_result) if total_revenue_result else 0
-        stats = {
-            'total_users': total_users,
-            'total_products': total_products,
-            'total_transactions': total_transactions,
-            'today_transactions': today_transactions,
-            'low_stock_products': low_stocks,
-            'total_revenue': total_revenue,
-            'admin': {
-                'id': user.id,
-                'username': user.username,
-                'email': user.email
-            },
-            'dashboard_updated': datetime.utcnow().isoformat()
+        from app.controllers.DashboardController import admin_stats
+        user = g.principal
+        stats = dict(admin_stats())
+        stats['admin'] = {
+            'id': user.id,
+            'username': user.username,
+            'email': user.email
         }
         return jsonify({
             'status': 'success',
@@ -552,33 +468,68 @@ def admin_get_users():
     return get_users()
 
 @bp.route('/admin/transactions', methods=['GET'])
+@admin_required
 def admin_get_transactions():
+    """Admin order list, newest first, paginated with ?cursor= from the previous page.
+
+    Filters: status, payment_method, user_id, start, end (ISO date/datetime).
+    archived=1 lists archived orders instead of live ones.
+    """
     try:
-        user_id = request.headers.get('X-User-ID')
-        if not user_id:
-            return jsonify({
-                'status': 'error',
-                'message': 'X-User-ID header is required'
-            }), 401
         from app.models.user import User
-        user = User.query.get(int(user_id))
-        if not user or not user.is_admin:
+        from app.models.transaction import Transaction, ArchivedTransaction
+        from app.params import parse_datetime, encode_cursor, decode_cursor
+        from app import db
+        args = request.args
+        limit = max(1, min(args.get('limit', 50, type=int), 200))
+        T = ArchivedTransaction if args.get('archived') in ('1', 'true') else Transaction
+        try:
+            query = db.session.query(
+                T.id,
+                T.transaction_code,
+                T.user_id,
+                User.username,
+                T.total_amount,
+                T.status,
+                T.payment_method,
+                T.shipping_address,
+                T.created_at
+            ).outerjoin(User, User.id == T.user_id)
+            if args.get('status'):
+                query = query.filter(T.status == args['status'])
+            if args.get('payment_method'):
+                query = query.filter(T.payment_method == args['payment_method'])
+            if args.get('user_id'):
+                query = query.filter(T.user_id == int(args['user_id']))
+            if args.get('start'):
+                query = query.filter(T.created_at >= parse_datetime(args['start']))
+            if args.get('end'):
+                query = query.filter(T.created_at < parse_datetime(args['end'], is_end=True))
+            if args.get('cursor'):
+                created_at, last_id = decode_cursor(args['cursor'], 2)
+                created_at, last_id = datetime.fromisoformat(created_at), int(last_id)
+                query = query.filter(db.or_(
+                    T.created_at < created_at,
+                    db.and_(T.created_at == created_at, T.id < last_id)
+                ))
+        except ValueError as e:
             return jsonify({
                 'status': 'error',
-                'message': 'Admin access required'
-            }), 403
-        from app.models.transaction import Transaction
-        transactions = Transaction.query.order_by(
-            Transaction.created_at.desc()
-        ).all()
+                'message': f'Invalid filter: {str(e)}'
+            }), 400
+        rows = query.order_by(
+            T.created_at.desc(),
+            T.id.desc()
+        ).limit(limit + 1).all()
+        has_more = len(rows) > limit
+        rows = rows[:limit]
         transactions_data = []
-        for transaction in transactions:
-            user = User.query.get(transaction.user_id)
+        for transaction in rows:
             transaction_data = {
                 'id': transaction.id,
                 'transaction_code': transaction.transaction_code,
                 'user_id': transaction.user_id,
-                'username': user.username if user else 'Unknown',
+                'username': transaction.username or 'Unknown',
                 'total_amount': float(transaction.total_amount) if transaction.total_amount else 0,
                 'status': transaction.status,
                 'payment_method': transaction.payment_method,
@@ -586,11 +537,14 @@ def admin_get_transactions():
                 'created_at': transaction.created_at.isoformat() if transaction.created_at else None
             }
             transactions_data.append(transaction_data)
+        next_cursor = encode_cursor(rows[-1].created_at, rows[-1].id) if has_more else None
         return jsonify({
             'status': 'success',
             'message': f'Found {len(transactions_data)} transactions',
             'data': transactions_data,
-            'count': len(transactions_data)
+            'count': len(transactions_data),
+            'has_more': has_more,
+            'next_cursor': next_cursor
         })
     except Exception as e:
         return jsonify({
@@ -598,114 +552,85 @@ def admin_get_transactions():
             'message': f'Error getting transactions: {str(e)}'
         }), 500
 
+@bp.route('/admin/db/pool', methods=['GET'])
+@admin_required
+def admin_pool_stats():
+    from app.dbpool import pool_stats
+    return jsonify({
+        'status': 'success',
+        'message': 'Connection pool stats',
+        'data': pool_stats()
+    })
+
+@bp.route('/admin/analytics/top-sellers', methods=['GET'])
+@admin_required
+def analytics_top_sellers():
+    from app.controllers.AnalyticsController import top_sellers
+    return top_sellers()
+
+@bp.route('/admin/analytics/revenue', methods=['GET'])
+@admin_required
+def analytics_revenue():
+    from app.controllers.AnalyticsController import revenue_series
+    return revenue_series()
+
+@bp.route('/admin/analytics/basket', methods=['GET'])
+@admin_required
+def analytics_basket():
+    from app.controllers.AnalyticsController import basket_size
+    return basket_size()
+
+@bp.route('/admin/analytics/category-mix', methods=['GET'])
+@admin_required
+def analytics_category_mix():
+    from app.controllers.AnalyticsController import category_mix
+    return category_mix()
+
+@bp.route('/admin/transactions/export', methods=['GET'])
+@admin_required
+def admin_export_transactions():
+    from app.controllers.ExportController import transactions_export
+    return transactions_export()
+
 @bp.route('/transactions/<int:transaction_id>', methods=['GET'])
+@login_required
 def get_transaction_detail(transaction_id):
     """Return a single transaction and its items. Accessible by owner or admin."""
     try:
-        user_id = request.headers.get('X-User-ID')
-        if not user_id:
-            return jsonify({'status': 'error', 'message': 'X-User-ID header is required'}), 401
-        from app.models.user import User
-        from app.models.transaction import Transaction, TransactionItem
-        from app.models.product import Product
-        user = User.query.get(int(user_id))
-        if not user:
-            return jsonify({'status': 'error', 'message': 'Invalid user'}), 401
-        txn = Transaction.query.get(transaction_id)
-        if not txn:
+        from app.controllers.TransactionController import transaction_detail
+        user = g.principal
+        txn_data = transaction_detail(transaction_id)
+        if not txn_data:
             return jsonify({'status': 'error', 'message': 'Transaction not found'}), 404
-        if not user.is_admin and txn.user_id != int(user_id):
+        if not user.is_admin and txn_data['user_id'] != user.id:
             return jsonify({'status': 'error', 'message': 'Unauthorized'}), 403
-        items = []
-        for it in txn.items:
-            prod = Product.query.get(it.product_id)
-            items.append({
-                'id': it.id,
-                'product_id': it.product_id,
-                'product_name': prod.name if prod else None,
-                'image_url': getattr(prod, 'image_url', None) if prod else None,
-                'quantity': it.quantity,
-                'price': float(it.price) if it.price else 0,
-                'subtotal': float(it.subtotal) if it.subtotal else 0
-            })
-        txn_data = {
-            'id': txn.id,
-            'transaction_code': txn.transaction_code,
-            'user_id': txn.user_id,
-            'total_amount': float(txn.total_amount) if txn.total_amount else 0,
-            'status': txn.status,
-            'payment_method': txn.payment_method,
-            'shipping_address': txn.shipping_address,
-            'notes': txn.notes,
-            'created_at': txn.created_at.isoformat() if txn.created_at else None,
-            'items': items
-        }
         return jsonify({'status': 'success', 'message': 'Transaction found', 'data': txn_data})
     except Exception as e:
         return jsonify({'status': 'error', 'message': f'Error fetching transaction: {str(e)}'}), 500
 
 @bp.route('/customer/dashboard', methods=['GET'])
+@login_required
 def customer_dashboard():
     try:
-        user_id = request.headers.get('X-User-ID')
-        if not user_id:
-            return jsonify({
-                'status': 'error',
-                'message': 'X-User-ID header is required'
-            }), 401
-        from app.models.user import User
-        from app.models.transaction import Transaction
-        from app.models.cart import Cart, CartItem
-        from app import db
-        from app.models.product import Product
-        user = User.query.get(int(user_id))
-        if not user:
-            return jsonify({
-                'status': 'error',
-                'message': 'Invalid user'
-            }), 401
+        from app.controllers.DashboardController import customer_stats
+        user = g.principal
         if user.is_admin:
             return jsonify({
                 'status': 'error',
                 'message': 'Customer access required'
             }), 403
-        total_orders = Transaction.query.filter_by(user_id=user.id).count()
-        total_spent_result = db.session.query(db.func.sum(Transaction.total_amount)).filter(Transaction.user_id == user.id).scalar()
-        total_spent = float(total_spent_result) if total_spent_result else 0
-        recent = Transaction.query.filter_by(user_id=user.id).order_by(Transaction.created_at.desc()).limit(5).all()
-        recent_list = []
-        for t in recent:
-            recent_list.append({
-                'id': t.id,
-                'transaction_code': t.transaction_code,
-                'total_amount': float(t.total_amount) if t.total_amount else 0,
-                'status': t.status,
-                'created_at': t.created_at.isoformat() if t.created_at else None
-            })
-        cart = Cart.query.filter_by(user_id=user.id).first()
-        item_count = 0
-        cart_total = 0
-        if cart:
-            items = CartItem.query.filter_by(cart_id=cart.id).all()
-            item_count = sum(i.quantity for i in items)
-            for i in items:
-                p = Product.query.get(i.product_id)
-                if p and hasattr(p, 'price'):
-                    cart_total += float(p.price) * i.quantity
+        stats = customer_stats(user.id)
         data = {
             'customer': {
                 'id': user.id,
                 'username': user.username,
                 'email': user.email
             },
-            'total_orders': total_orders,
-            'total_spent': total_spent,
-            'recent_transactions': recent_list,
-            'cart': {
-                'item_count': item_count,
-                'cart_total': cart_total
-            },
-            'dashboard_updated': datetime.utcnow().isoformat()
+            'total_orders': stats['total_orders'],
+            'total_spent': stats['total_spent'],
+            'recent_transactions': stats['recent_transactions'],
+            'cart': stats['cart'],
+            'dashboard_updated': stats['dashboard_updated']
         }
         return jsonify({
             'status': 'success',
@@ -719,17 +644,13 @@ def customer_dashboard():
         }), 500
 
 @bp.route('/cart', methods=['GET'])
+@login_required
 def get_cart():
     try:
         from app.models.cart import Cart, CartItem
         from app.models.product import Product
         from app import response
-        user_id = request.headers.get('X-User-ID')
-        if not user_id:
-            return jsonify({
-                'status': 'error',
-                'message': 'X-User-ID header required'
-            }), 401
+        user_id = g.principal.id
         cart = Cart.query.filter_by(user_id=int(user_id)).first()
         if not cart:
             return jsonify({
@@ -777,17 +698,14 @@ def get_cart():
         }), 500
 
 @bp.route('/cart/add', methods=['POST'])
+@login_required
 def add_to_cart():
     try:
         from app.models.cart import Cart, CartItem
         from app.models.product import Product
         from app import response, db
-        user_id = request.headers.get('X-User-ID')
-        if not user_id:
-            return jsonify({
-                'status': 'error',
-                'message': 'X-User-ID header required'
-            }), 401
+        from app.controllers.DashboardController import invalidate_customer_stats
+        user_id = g.principal.id
         data = request.json
         product_id = data.get('product_id')
         quantity = data.get('quantity', 1)
@@ -837,6 +755,7 @@ def add_to_cart():
                 quantity=quantity
             )
             db.session.add(cart_item)
+        on_commit(invalidate_customer_stats, user_id)
         db.session.commit()
         return jsonify({
             'status': 'success',
@@ -856,17 +775,14 @@ def add_to_cart():
         }), 500
 
 @bp.route('/cart/update/<int:item_id>', methods=['PUT'])
+@login_required
 def update_cart_item(item_id):
     try:
         from app.models.cart import CartItem, Cart
         from app.models.product import Product
         from app import response, db
-        user_id = request.headers.get('X-User-ID')
-        if not user_id:
-            return jsonify({
-                'status': 'error',
-                'message': "X-User-ID header required"
-            }), 401
+        from app.controllers.DashboardController import invalidate_customer_stats
+        user_id = g.principal.id
         data = request.json
         quantity = data.get('quantity')
         if quantity is None:
@@ -888,6 +804,7 @@ def update_cart_item(item_id):
             }), 403
         if quantity <= 0:
             db.session.delete(cart_item)
+            on_commit(invalidate_customer_stats, user_id)
             db.session.commit()
             return jsonify({
                 'status': 'success',
@@ -900,6 +817,7 @@ def update_cart_item(item_id):
                 'message': "Product not found"
             }), 404
         cart_item.quantity = quantity
+        on_commit(invalidate_customer_stats, user_id)
         db.session.commit()
         subtotal = float(product.price) * quantity
         return jsonify({
@@ -921,16 +839,13 @@ def update_cart_item(item_id):
         }), 500
 
 @bp.route('/cart/remove/<int:item_id>', methods=['DELETE'])
+@login_required
 def remove_cart_item(item_id):
     try:
         from app.models.cart import CartItem, Cart
         from app import db
-        user_id = request.headers.get('X-User-ID')
-        if not user_id:
-            return jsonify({
-                'status': 'error',
-                'message': 'Authentication required'
-            }), 401
+        from app.controllers.DashboardController import invalidate_customer_stats
+        user_id = g.principal.id
         cart_item = CartItem.query.get(item_id)
         if not cart_item:
             return jsonify({
@@ -944,6 +859,7 @@ def remove_cart_item(item_id):
                 'message': 'Unauthorized'
             }), 403
         db.session.delete(cart_item)
+        on_commit(invalidate_customer_stats, user_id)
         db.session.commit()
         return jsonify({
             'status': 'success',
@@ -961,16 +877,13 @@ def remove_cart_item(item_id):
         }), 500
     
 @bp.route('/cart/clear', methods=['DELETE'])
+@login_required
 def clear_cart():
     try:
         from app.models.cart import Cart, CartItem
         from app import db
-        user_id = request.headers.get('X-User-ID')
-        if not user_id:
-            return jsonify({
-                'status': 'error',
-                'message': 'Authentication required'
-            }), 401
+        from app.controllers.DashboardController import invalidate_customer_stats
+        user_id = g.principal.id
         cart = Cart.query.filter_by(user_id=int(user_id)).first()
         if not cart:
             return jsonify({
@@ -978,6 +891,7 @@ def clear_cart():
                 'message': 'Cart is already empty'
             })
         CartItem.query.filter_by(cart_id=cart.id).delete()
+        on_commit(invalidate_customer_stats, user_id)
         db.session.commit()
         return jsonify({
             'status': 'success',
@@ -996,6 +910,8 @@ def clear_cart():
         }), 500
 
 @bp.route('/cart/checkout', methods=['POST'])
+@login_required
+@rate_limit('checkout', scope='user')
 def checkout_cart():
     try:
         from app.models.cart import Cart, CartItem
@@ -1006,24 +922,13 @@ def checkout_cart():
         from app import db
         import random
         import string
-        user_id = request.headers.get('X-User-ID')
-        if not user_id:
-            return jsonify({
-                'status': 'error',
-                'message': 'Authentication required'
-            }), 401
+        user_id = g.principal.id
         data = request.json
         payment_method = data.get('payment_method', 'Bank Transfer')
         shipping_address = data.get('shipping_address')
         notes = data.get('notes', '')
-        user = User.query.get(int(user_id))
-        if not user:
-            return jsonify({
-                'status': 'error',
-                'message': 'User not found'
-            }), 404
         if not shipping_address:
-            shipping_address = user.address
+            shipping_address = db.session.query(User.address).filter(User.id == user_id).scalar()
         cart = Cart.query.filter_by(user_id=int(user_id)).first()
         if not cart:
             return jsonify({
@@ -1038,11 +943,13 @@ def checkout_cart():
             }), 400
         total_amount = 0
         transaction_items = []
-        for item in cart_items:
+        # lock stock rows in product order so concurrent checkouts cannot deadlock
+        for item in sorted(cart_items, key=lambda i: i.product_id):
             product = Product.query.get(item.product_id)
             if not product:
                 continue
-            stock = Stock.query.filter_by(product_id=product.id).first()
+            # held until commit, so the check and the decrement cannot interleave
+            stock = Stock.query.filter_by(product_id=product.id).with_for_update().populate_existing().first()
             if not stock or stock.quantity < item.quantity:
                 return jsonify({
                     'status': 'error',
@@ -1073,12 +980,18 @@ def checkout_cart():
         )
         db.session.add(transaction)
         db.session.flush()
+        from app.controllers.StockController import record_movement
+        from app.controllers.DashboardController import invalidate_admin_stats, invalidate_customer_stats
+        on_commit(invalidate_admin_stats)
         for i, item in enumerate(transaction_items):
             item.transaction_id = transaction.id
             db.session.add(item)
-            stock = Stock.query.filter_by(product_id=item.product_id).first()
-            stock.quantity -= item.quantity
+            record_movement(item.product_id, -item.quantity, 'sale', transaction.transaction_code)
+        db.session.flush()
+        from app import rollups
+        rollups.apply_transaction(transaction)
         CartItem.query.filter_by(cart_id=cart.id).delete()
+        on_commit(invalidate_customer_stats, user_id)
         db.session.commit()
         return jsonify({
             'status': 'success',
@@ -1100,9 +1013,31 @@ def checkout_cart():
 
 @bp.route('/health', methods=['GET'])
 def health_check():
+    from app.health import readiness
+    ready, details = readiness()
+    return jsonify({
+        'status': 'success' if ready else 'error',
+        'message': 'API is healthy' if ready else 'Database unavailable',
+        'timestamp': datetime.utcnow().isoformat(),
+        'database': 'connected' if ready else 'unavailable',
+        'details': details
+    }), 200 if ready else 503
+
+@bp.route('/health/live', methods=['GET'])
+def health_live():
     return jsonify({
         'status': 'success',
-        'message': 'API is healthy',
+        'message': 'alive',
+        'timestamp': datetime.utcnow().isoformat()
+    })
+
+@bp.route('/health/ready', methods=['GET'])
+def health_ready():
+    from app.health import readiness
+    ready, details = readiness()
+    return jsonify({
+        'status': 'success' if ready else 'error',
+        'message': 'ready' if ready else 'not ready',
         'timestamp': datetime.utcnow().isoformat(),
-        'database': 'connected'  
-    })
\ No newline at end of file
+        **details
+    }), 200 if ready else 503
\ No newline at end of file
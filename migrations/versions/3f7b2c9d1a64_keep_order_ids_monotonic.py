@@ -0,0 +1,50 @@
+"""Keep order ids monotonic
+
+Archived orders keep their ids, so the live tables must never hand one out
+again. On MySQL the AUTO_INCREMENT counters move past the highest archived
+id. On SQLite the tables are rebuilt with AUTOINCREMENT and sqlite_sequence is
+seeded the same way.
+
+Revision ID: 3f7b2c9d1a64
+Revises: d58e1b3a7f20
+Create Date: 2026-10-19 21:37:02.581946
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3f7b2c9d1a64'
+down_revision = 'd58e1b3a7f20'
+branch_labels = None
+depends_on = None
+
+TABLES = (('transactions', 'transactions_archive'), ('transaction_items', 'transaction_items_archive'))
+
+
+def _highest_id(live, archived):
+    return op.get_bind().execute(sa.text(
+        f"SELECT MAX(id) FROM (SELECT MAX(id) AS id FROM {live} UNION ALL SELECT MAX(id) FROM {archived}) ids"
+    )).scalar() or 0
+
+
+def upgrade():
+    dialect = op.get_bind().dialect.name
+    for live, archived in TABLES:
+        highest = _highest_id(live, archived)
+        if dialect == 'mysql':
+            op.execute(f"ALTER TABLE {live} AUTO_INCREMENT = {highest + 1}")
+        elif dialect == 'sqlite':
+            with op.batch_alter_table(live, recreate='always', table_kwargs={'sqlite_autoincrement': True}):
+                pass
+            op.execute(f"DELETE FROM sqlite_sequence WHERE name = '{live}'")
+            op.execute(f"INSERT INTO sqlite_sequence (name, seq) VALUES ('{live}', {highest})")
+
+
+def downgrade():
+    # MySQL counters only ever move forward; nothing to undo there
+    if op.get_bind().dialect.name == 'sqlite':
+        for live, _ in TABLES:
+            with op.batch_alter_table(live, recreate='always', table_kwargs={'sqlite_autoincrement': False}):
+                pass
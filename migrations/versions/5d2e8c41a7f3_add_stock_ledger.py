@@ -0,0 +1,61 @@
+"""Add append-only stock ledger and snapshots
+
+Revision ID: 5d2e8c41a7f3
+Revises: 11589e2314c2
+Create Date: 2026-10-19 09:12:40.118204
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5d2e8c41a7f3'
+down_revision = '11589e2314c2'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('stock_movements',
+    sa.Column('id', sa.BigInteger(), autoincrement=True, nullable=False),
+    sa.Column('product_id', sa.BigInteger(), nullable=False),
+    sa.Column('delta', sa.Integer(), nullable=False),
+    sa.Column('reason', sa.String(length=50), nullable=False),
+    sa.Column('reference_id', sa.String(length=100), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['product_id'], ['products.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('stock_movements', schema=None) as batch_op:
+        batch_op.create_index('ix_stock_movements_product_id_id', ['product_id', 'id'], unique=False)
+
+    op.create_table('stock_snapshots',
+    sa.Column('id', sa.BigInteger(), autoincrement=True, nullable=False),
+    sa.Column('product_id', sa.BigInteger(), nullable=False),
+    sa.Column('quantity', sa.Integer(), nullable=False),
+    sa.Column('last_movement_id', sa.BigInteger(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['product_id'], ['products.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('stock_snapshots', schema=None) as batch_op:
+        batch_op.create_index('ix_stock_snapshots_product_id_id', ['product_id', 'id'], unique=False)
+
+    # Seed the ledger with the current quantities so reconciliation starts clean
+    op.execute(
+        "INSERT INTO stock_movements (product_id, delta, reason, created_at) "
+        "SELECT product_id, quantity, 'opening_balance', CURRENT_TIMESTAMP "
+        "FROM stocks WHERE quantity <> 0"
+    )
+
+
+def downgrade():
+    with op.batch_alter_table('stock_snapshots', schema=None) as batch_op:
+        batch_op.drop_index('ix_stock_snapshots_product_id_id')
+
+    op.drop_table('stock_snapshots')
+    with op.batch_alter_table('stock_movements', schema=None) as batch_op:
+        batch_op.drop_index('ix_stock_movements_product_id_id')
+
+    op.drop_table('stock_movements')
@@ -0,0 +1,55 @@
+"""Add daily sales rollup tables
+
+Backfill existing history after upgrading with
+`python -m scripts.rebuild_sales_rollups`.
+
+Revision ID: 8b41f0c2d9e6
+Revises: 5d2e8c41a7f3
+Create Date: 2026-10-19 10:02:15.552871
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8b41f0c2d9e6'
+down_revision = '5d2e8c41a7f3'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('daily_sales',
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('revenue', sa.Numeric(precision=14, scale=2), nullable=False),
+    sa.Column('order_count', sa.Integer(), nullable=False),
+    sa.Column('units', sa.Integer(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('day')
+    )
+    op.create_table('daily_product_sales',
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('product_id', sa.BigInteger(), nullable=False),
+    sa.Column('revenue', sa.Numeric(precision=14, scale=2), nullable=False),
+    sa.Column('order_count', sa.Integer(), nullable=False),
+    sa.Column('units', sa.Integer(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['product_id'], ['products.id'], ),
+    sa.PrimaryKeyConstraint('day', 'product_id')
+    )
+    op.create_table('daily_category_sales',
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('category', sa.String(length=100), nullable=False),
+    sa.Column('revenue', sa.Numeric(precision=14, scale=2), nullable=False),
+    sa.Column('order_count', sa.Integer(), nullable=False),
+    sa.Column('units', sa.Integer(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('day', 'category')
+    )
+
+
+def downgrade():
+    op.drop_table('daily_category_sales')
+    op.drop_table('daily_product_sales')
+    op.drop_table('daily_sales')
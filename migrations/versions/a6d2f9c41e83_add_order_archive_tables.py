@@ -0,0 +1,67 @@
+"""Add order archive tables
+
+transactions_archive and transaction_items_archive hold finished orders moved
+out of the live tables by scripts/archive_transactions.py. Rows keep their
+original ids. There are no foreign keys, so archived rows do not hold up
+deletes elsewhere.
+
+Revision ID: a6d2f9c41e83
+Revises: f3c8a61e5d27
+Create Date: 2026-10-19 20:05:12.408115
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a6d2f9c41e83'
+down_revision = 'f3c8a61e5d27'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('transactions_archive',
+    sa.Column('id', sa.BigInteger(), autoincrement=False, nullable=False),
+    sa.Column('transaction_code', sa.String(length=50), nullable=False),
+    sa.Column('user_id', sa.BigInteger(), nullable=False),
+    sa.Column('total_amount', sa.Numeric(precision=12, scale=2), nullable=False),
+    sa.Column('status', sa.String(length=50), nullable=True),
+    sa.Column('payment_method', sa.String(length=100), nullable=True),
+    sa.Column('shipping_address', sa.Text(), nullable=False),
+    sa.Column('notes', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.Column('archived_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('transaction_code')
+    )
+    with op.batch_alter_table('transactions_archive', schema=None) as batch_op:
+        batch_op.create_index('ix_transactions_archive_created_at_id', ['created_at', 'id'], unique=False)
+        batch_op.create_index('ix_transactions_archive_user_id_created_at', ['user_id', 'created_at'], unique=False)
+
+    op.create_table('transaction_items_archive',
+    sa.Column('id', sa.BigInteger(), autoincrement=False, nullable=False),
+    sa.Column('transaction_id', sa.BigInteger(), nullable=False),
+    sa.Column('product_id', sa.BigInteger(), nullable=False),
+    sa.Column('quantity', sa.Integer(), nullable=False),
+    sa.Column('price', sa.Numeric(precision=10, scale=2), nullable=False),
+    sa.Column('subtotal', sa.Numeric(precision=12, scale=2), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('transaction_items_archive', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_transaction_items_archive_transaction_id'), ['transaction_id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('transaction_items_archive', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_transaction_items_archive_transaction_id'))
+
+    op.drop_table('transaction_items_archive')
+    with op.batch_alter_table('transactions_archive', schema=None) as batch_op:
+        batch_op.drop_index('ix_transactions_archive_user_id_created_at')
+        batch_op.drop_index('ix_transactions_archive_created_at_id')
+
+    op.drop_table('transactions_archive')
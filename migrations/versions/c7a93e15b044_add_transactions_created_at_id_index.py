@@ -0,0 +1,26 @@
+"""Add transactions (created_at, id) index for keyset pagination
+
+Revision ID: c7a93e15b044
+Revises: 8b41f0c2d9e6
+Create Date: 2026-10-19 10:48:03.904117
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c7a93e15b044'
+down_revision = '8b41f0c2d9e6'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('transactions', schema=None) as batch_op:
+        batch_op.create_index('ix_transactions_created_at_id', ['created_at', 'id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('transactions', schema=None) as batch_op:
+        batch_op.drop_index('ix_transactions_created_at_id')
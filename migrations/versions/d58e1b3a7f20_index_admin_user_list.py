@@ -0,0 +1,31 @@
+"""Index the admin user list filters
+
+Username and email prefix search already use their unique indexes; these
+cover the is_admin / is_verified filters paged by id.
+
+Revision ID: d58e1b3a7f20
+Revises: a6d2f9c41e83
+Create Date: 2026-10-19 20:48:33.215904
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd58e1b3a7f20'
+down_revision = 'a6d2f9c41e83'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.create_index('ix_users_is_admin_id', ['is_admin', 'id'], unique=False)
+        batch_op.create_index('ix_users_is_verified_id', ['is_verified', 'id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.drop_index('ix_users_is_verified_id')
+        batch_op.drop_index('ix_users_is_admin_id')
@@ -0,0 +1,38 @@
+"""Add products.sold_count
+
+Revision ID: e41b7d09a2c5
+Revises: c7a93e15b044
+Create Date: 2026-10-19 11:21:40.118532
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e41b7d09a2c5'
+down_revision = 'c7a93e15b044'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('products', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('sold_count', sa.Integer(), server_default='0', nullable=False))
+        batch_op.create_index(batch_op.f('ix_products_sold_count'), ['sold_count'], unique=False)
+
+    # backfill from non-cancelled order history
+    op.execute(
+        "UPDATE products SET sold_count = ("
+        " SELECT COALESCE(SUM(transaction_items.quantity), 0)"
+        " FROM transaction_items"
+        " JOIN transactions ON transactions.id = transaction_items.transaction_id"
+        " WHERE transaction_items.product_id = products.id"
+        " AND transactions.status != 'cancelled')"
+    )
+
+
+def downgrade():
+    with op.batch_alter_table('products', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_products_sold_count'))
+        batch_op.drop_column('sold_count')
@@ -0,0 +1,81 @@
+"""Index hot lookup paths
+
+Adds the indexes behind cart, order, stock and catalogue lookups, unique where
+the code assumes one row (cart per user, stock per product, cart line per
+product). The upgrade refuses to run while duplicates exist; merge them first.
+
+Revision ID: f3c8a61e5d27
+Revises: e41b7d09a2c5
+Create Date: 2026-10-19 11:52:07.630914
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f3c8a61e5d27'
+down_revision = 'e41b7d09a2c5'
+branch_labels = None
+depends_on = None
+
+UNIQUE_KEYS = (
+    ('carts', ('user_id',)),
+    ('stocks', ('product_id',)),
+    ('cart_items', ('cart_id', 'product_id')),
+)
+
+
+def _check_duplicates():
+    conn = op.get_bind()
+    for table, columns in UNIQUE_KEYS:
+        cols = ', '.join(columns)
+        duplicate = conn.execute(sa.text(
+            f"SELECT {cols} FROM {table} GROUP BY {cols} HAVING COUNT(*) > 1 LIMIT 1"
+        )).first()
+        if duplicate is not None:
+            raise RuntimeError(
+                f"{table} has duplicate rows for ({cols}) = {tuple(duplicate)}; "
+                f"merge them before adding the unique index"
+            )
+
+
+def upgrade():
+    _check_duplicates()
+    with op.batch_alter_table('carts', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_carts_user_id'), ['user_id'], unique=True)
+
+    with op.batch_alter_table('cart_items', schema=None) as batch_op:
+        batch_op.create_index('ix_cart_items_cart_id_product_id', ['cart_id', 'product_id'], unique=True)
+
+    with op.batch_alter_table('stocks', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_stocks_product_id'), ['product_id'], unique=True)
+
+    with op.batch_alter_table('transactions', schema=None) as batch_op:
+        batch_op.create_index('ix_transactions_user_id_created_at', ['user_id', 'created_at'], unique=False)
+
+    with op.batch_alter_table('transaction_items', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_transaction_items_transaction_id'), ['transaction_id'], unique=False)
+
+    with op.batch_alter_table('products', schema=None) as batch_op:
+        batch_op.create_index('ix_products_category_is_available', ['category', 'is_available'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('products', schema=None) as batch_op:
+        batch_op.drop_index('ix_products_category_is_available')
+
+    with op.batch_alter_table('transaction_items', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_transaction_items_transaction_id'))
+
+    with op.batch_alter_table('transactions', schema=None) as batch_op:
+        batch_op.drop_index('ix_transactions_user_id_created_at')
+
+    with op.batch_alter_table('stocks', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_stocks_product_id'))
+
+    with op.batch_alter_table('cart_items', schema=None) as batch_op:
+        batch_op.drop_index('ix_cart_items_cart_id_product_id')
+
+    with op.batch_alter_table('carts', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_carts_user_id'))
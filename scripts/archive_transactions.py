@@ -0,0 +1,51 @@
+"""Move completed and cancelled orders older than a cutoff into the archive tables.
+
+    python -m scripts.archive_transactions [--days 365 | --before 2025-01-01] \\
+        [--batch-size 1000] [--pause 0.5] [--dry-run]
+
+Safe to interrupt and re-run: each batch commits on its own. Run it off-peak
+from cron; --pause spaces the batches out.
+"""
+import argparse
+import sys
+from datetime import datetime, timedelta
+from app import archive, create_app
+from app.params import parse_datetime
+
+def main():
+    parser = argparse.ArgumentParser(description='Archive finished orders')
+    parser.add_argument('--days', type=int, help='Archive orders older than this many days (default: ARCHIVE_AFTER_DAYS)')
+    parser.add_argument('--before', help='Archive orders created before this ISO date/datetime')
+    parser.add_argument('--batch-size', type=int, help='Orders per batch (default: ARCHIVE_BATCH_SIZE)')
+    parser.add_argument('--pause', type=float, default=0.0, help='Seconds to sleep between batches')
+    parser.add_argument('--dry-run', action='store_true', help='Only count the orders that would move')
+    args = parser.parse_args()
+
+    app = create_app()
+    with app.app_context():
+        if args.before:
+            try:
+                cutoff = parse_datetime(args.before)
+            except ValueError as e:
+                parser.error(str(e))
+        else:
+            days = args.days if args.days is not None else app.config['ARCHIVE_AFTER_DAYS']
+            cutoff = datetime.utcnow() - timedelta(days=days)
+        pending = archive.pending_count(cutoff)
+        print(f"{pending} orders ({', '.join(archive.ARCHIVABLE_STATUSES)}) created before {cutoff.isoformat()}.")
+        if args.dry_run or not pending:
+            return 0
+        batch_size = args.batch_size or app.config['ARCHIVE_BATCH_SIZE']
+        try:
+            moved = archive.archive(
+                cutoff, batch_size, args.pause,
+                progress=lambda total: print(f"  archived {total}/{pending}", end='\r', flush=True)
+            )
+        except archive.ArchiveCollision as e:
+            print(f"\nStopped: {e}", file=sys.stderr)
+            return 1
+        print(f"\nArchived {moved} orders.")
+    return 0
+
+if __name__ == '__main__':
+    raise SystemExit(main())
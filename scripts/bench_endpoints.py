@@ -0,0 +1,206 @@
+"""Benchmark the real endpoints in-process against a seeded database.
+
+    python -m scripts.seed_data --url sqlite:///bench.db --create-tables --end 2026-01-01
+    python -m scripts.bench_endpoints --url sqlite:///bench.db --concurrency 8 \\
+        --requests 500 --output bench.json [--baseline baseline.json]
+
+Each worker thread drives create_app()'s WSGI app through its own test client,
+logged in as its own customer. Reported per scenario: p50/p95/p99 latency,
+throughput, error count and SQL statements per request. Against a baseline, a
+scenario regresses when its p95 grows by more than --tolerance or it issues
+more statements per request; the exit status is then 1.
+"""
+import argparse
+import json
+import random
+import secrets
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from sqlalchemy import event
+from app import create_app, db
+from app.config import Config
+from app.models.product import Product
+from app.models.transaction import Transaction
+from app.models.user import User
+
+_counter = threading.local()
+
+def _count_statement(conn, cursor, statement, parameters, context, executemany):
+    _counter.statements = getattr(_counter, 'statements', 0) + 1
+
+def statements():
+    return getattr(_counter, 'statements', 0)
+
+class Worker:
+    """One client session: a test client plus a customer and an admin token"""
+
+    def __init__(self, app, customer, admin_token, password, rng, product_ids, transaction_ids):
+        self.client = app.test_client()
+        self.rng = rng
+        self.product_ids = product_ids
+        self.transaction_ids = transaction_ids
+        self.customer = {'Authorization': 'Bearer ' + self.login(customer, password)}
+        self.admin = {'Authorization': 'Bearer ' + admin_token}
+
+    def login(self, username, password):
+        res = self.client.post('/api/login', json={'username': username, 'password': password})
+        if res.status_code != 200:
+            raise RuntimeError(f"login as {username} failed: {res.status_code} {res.get_data(as_text=True)[:200]}")
+        return res.json['token']
+
+    def add_to_cart(self):
+        return self.client.post('/api/cart/add', headers=self.customer, json={
+            'product_id': self.rng.choice(self.product_ids), 'quantity': 1
+        })
+
+    # scenario name -> (setup, request); only the request is timed
+    def scenarios(self):
+        return {
+            'catalog_list': (None, lambda: self.client.get('/api/products')),
+            'product_detail': (None, lambda: self.client.get(f'/api/products/{self.rng.choice(self.product_ids)}')),
+            'cart_add': (None, self.add_to_cart),
+            'cart_get': (None, lambda: self.client.get('/api/cart', headers=self.customer)),
+            'checkout': (self.add_to_cart, lambda: self.client.post('/api/cart/checkout', headers=self.customer, json={})),
+            'admin_dashboard': (None, lambda: self.client.get('/api/admin/dashboard', headers=self.admin)),
+            'customer_dashboard': (None, lambda: self.client.get('/api/customer/dashboard', headers=self.customer)),
+            'transaction_detail': (None, lambda: self.client.get(
+                f'/api/transactions/{self.rng.choice(self.transaction_ids)}', headers=self.admin
+            )),
+        }
+
+def percentile(ordered, pct):
+    """Nearest-rank percentile of an already sorted list"""
+    if not ordered:
+        return 0.0
+    rank = max(1, int(round(pct / 100 * len(ordered) + 0.5)))
+    return ordered[min(rank, len(ordered)) - 1]
+
+def run_scenario(workers, name, total):
+    def drive(worker, count):
+        setup, call = worker.scenarios()[name]
+        samples = []
+        for _ in range(count):
+            if setup:
+                setup()
+            before = statements()
+            started = time.perf_counter()
+            res = call()
+            elapsed = time.perf_counter() - started
+            samples.append((elapsed, statements() - before, res.status_code))
+        return samples
+
+    share, extra = divmod(total, len(workers))
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=len(workers)) as pool:
+        futures = [pool.submit(drive, w, share + (i < extra)) for i, w in enumerate(workers)]
+        samples = [s for f in futures for s in f.result()]
+    wall = time.perf_counter() - started
+
+    latencies = sorted(s[0] * 1000 for s in samples)
+    queries = [s[1] for s in samples]
+    return {
+        'requests': len(samples),
+        'errors': sum(1 for s in samples if s[2] >= 400),
+        'throughput_rps': round(len(samples) / wall, 2) if wall else 0,
+        'p50_ms': round(percentile(latencies, 50), 3),
+        'p95_ms': round(percentile(latencies, 95), 3),
+        'p99_ms': round(percentile(latencies, 99), 3),
+        'mean_ms': round(sum(latencies) / len(latencies), 3) if latencies else 0,
+        'sql_per_request': round(sum(queries) / len(queries), 2) if queries else 0,
+        'sql_max': max(queries) if queries else 0
+    }
+
+def compare(results, baseline, tolerance):
+    regressions = []
+    for name, current in results['scenarios'].items():
+        before = baseline.get('scenarios', {}).get(name)
+        if not before:
+            continue
+        if before['p95_ms'] and current['p95_ms'] > before['p95_ms'] * (1 + tolerance):
+            regressions.append(f"{name}: p95 {before['p95_ms']}ms -> {current['p95_ms']}ms")
+        if current['sql_per_request'] > before['sql_per_request']:
+            regressions.append(f"{name}: sql/request {before['sql_per_request']} -> {current['sql_per_request']}")
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark API endpoints in-process')
+    parser.add_argument('--url', help='SQLAlchemy URL of a seeded database (default: the configured one)')
+    parser.add_argument('--concurrency', type=int, default=4)
+    parser.add_argument('--requests', type=int, default=200, help='Requests per scenario')
+    parser.add_argument('--warmup', type=int, default=20, help='Untimed requests per scenario first')
+    parser.add_argument('--scenarios', help='Comma separated subset to run')
+    parser.add_argument('--password', default='password', help='Password of the seeded users')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--output', help='Write results as JSON here')
+    parser.add_argument('--baseline', help='Compare against a previous --output file')
+    parser.add_argument('--tolerance', type=float, default=0.2, help='Allowed p95 growth over the baseline')
+    args = parser.parse_args()
+
+    if args.url:
+        Config.SQLALCHEMY_DATABASE_URI = args.url
+        Config.SQLALCHEMY_BINDS = {}
+    # the benchmark is one client hammering checkout; it would just measure 429s
+    Config.RATELIMIT_ENABLED = False
+    # tokens never leave this process, so a throwaway key will do
+    Config.AUTH_TOKEN_KEYS = Config.AUTH_TOKEN_KEYS or [('bench', secrets.token_urlsafe(32))]
+    app = create_app()
+    rng = random.Random(args.seed)
+    with app.app_context():
+        for engine in db.engines.values():
+            event.listen(engine, 'before_cursor_execute', _count_statement)
+        admin = User.query.filter_by(is_admin=True).order_by(User.id).first()
+        customers = [u.username for u in User.query.filter(User.is_admin == False)
+                     .order_by(User.id).limit(args.concurrency).all()]
+        product_ids = [row.id for row in db.session.query(Product.id).filter(Product.is_available == True)]
+        transaction_ids = [row.id for row in db.session.query(Transaction.id).order_by(Transaction.id.desc()).limit(10000)]
+        database = db.engine.url.render_as_string(hide_password=True)
+    if admin is None or len(customers) < args.concurrency or not product_ids or not transaction_ids:
+        parser.error('database needs an admin, one customer per worker, products and orders; run scripts.seed_data first')
+
+    admin_token = app.test_client().post(
+        '/api/login', json={'username': admin.username, 'password': args.password}
+    ).json['token']
+    workers = [
+        Worker(app, customer, admin_token, args.password, random.Random(rng.random()), product_ids, transaction_ids)
+        for customer in customers
+    ]
+    names = list(workers[0].scenarios())
+    if args.scenarios:
+        wanted = args.scenarios.split(',')
+        unknown = set(wanted) - set(names)
+        if unknown:
+            parser.error(f"unknown scenarios: {', '.join(sorted(unknown))}")
+        names = [n for n in names if n in wanted]
+
+    results = {
+        'meta': {
+            'date': datetime.utcnow().isoformat(),
+            'database': database,
+            'concurrency': args.concurrency,
+            'requests': args.requests
+        },
+        'scenarios': {}
+    }
+    for name in names:
+        if args.warmup:
+            run_scenario(workers, name, args.warmup)
+        stats = run_scenario(workers, name, args.requests)
+        results['scenarios'][name] = stats
+        print(f"{name:20} p50={stats['p50_ms']:8.2f}ms p95={stats['p95_ms']:8.2f}ms p99={stats['p99_ms']:8.2f}ms "
+              f"{stats['throughput_rps']:8.1f} req/s  sql/req={stats['sql_per_request']:<6} errors={stats['errors']}")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        for line in regressions:
+            print('REGRESSION', line)
+        return 1 if regressions else 0
+    return 0
+
+if __name__ == '__main__':
+    raise SystemExit(main())
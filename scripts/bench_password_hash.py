@@ -0,0 +1,40 @@
+import argparse
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from werkzeug.security import generate_password_hash, check_password_hash
+from app.config import Config
+
+def bench(method, workers, seconds):
+    stored = generate_password_hash('benchmark-password', method)
+    deadline = time.perf_counter() + seconds
+
+    def worker():
+        done = 0
+        while time.perf_counter() < deadline:
+            check_password_hash(stored, 'benchmark-password')
+            done += 1
+        return done
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        total = sum(f.result() for f in [pool.submit(worker) for _ in range(workers)])
+    return total / (time.perf_counter() - started)
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure password verifications (logins) per second')
+    parser.add_argument('--method', default=Config.PASSWORD_HASH_METHOD)
+    parser.add_argument('--workers', type=int, default=Config.PASSWORD_HASH_WORKERS)
+    parser.add_argument('--seconds', type=float, default=5)
+    args = parser.parse_args()
+
+    cores = min(args.workers, os.cpu_count() or 1)
+    single = bench(args.method, 1, args.seconds)
+    pooled = bench(args.method, args.workers, args.seconds)
+    print(f"method:              {args.method}")
+    print(f"single thread:       {single:.1f} logins/s ({1000 / single:.1f} ms each)")
+    print(f"pool of {args.workers} workers:   {pooled:.1f} logins/s")
+    print(f"per core:            {pooled / cores:.1f} logins/s/core")
+
+if __name__ == '__main__':
+    main()
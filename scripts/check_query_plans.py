@@ -0,0 +1,88 @@
+"""EXPLAIN the hot lookup queries and fail if any of them scans a whole table.
+
+Run against a migrated database, ideally one with realistic data: on tiny
+tables MySQL may legitimately prefer a full scan.
+
+    python -m scripts.check_query_plans [--verbose]
+"""
+import argparse
+from app import create_app, db
+from app.models.cart import Cart, CartItem
+from app.models.product import Product
+from app.models.stock import Stock
+from app.models.user import User
+from app.models.transaction import Transaction, TransactionItem, ArchivedTransaction, ArchivedTransactionItem
+
+def key_queries():
+    # a non-indexed column in each projection keeps index-only plans from hiding a bad access path
+    return {
+        'cart by user': db.select(Cart.id, Cart.updated_at).where(Cart.user_id == 1),
+        'cart line by product': db.select(CartItem.id, CartItem.quantity).where(
+            CartItem.cart_id == 1, CartItem.product_id == 1
+        ),
+        'cart lines': db.select(CartItem.id, CartItem.quantity).where(CartItem.cart_id == 1),
+        'stock by product': db.select(Stock.id, Stock.quantity).where(Stock.product_id == 1),
+        'orders by user': db.select(Transaction.id, Transaction.total_amount).where(
+            Transaction.user_id == 1
+        ).order_by(Transaction.created_at.desc()).limit(5),
+        'order lines': db.select(TransactionItem.id, TransactionItem.quantity).where(TransactionItem.transaction_id == 1),
+        'archived orders by user': db.select(ArchivedTransaction.id, ArchivedTransaction.total_amount).where(
+            ArchivedTransaction.user_id == 1
+        ).order_by(ArchivedTransaction.created_at.desc()).limit(5),
+        'archived order lines': db.select(ArchivedTransactionItem.id, ArchivedTransactionItem.quantity).where(
+            ArchivedTransactionItem.transaction_id == 1
+        ),
+        'archival candidates': db.select(Transaction.id).where(
+            Transaction.status.in_(('completed', 'cancelled')), Transaction.created_at < '2020-01-01'
+        ).order_by(Transaction.created_at, Transaction.id).limit(1000),
+        'admin order page': db.select(Transaction.id, Transaction.total_amount).order_by(
+            Transaction.created_at.desc(), Transaction.id.desc()
+        ).limit(50),
+        'products by category': db.select(Product.id, Product.name).where(
+            Product.category == 'coffee', Product.is_available == True
+        ),
+        'admin user page': db.select(User.id, User.phone).where(User.id > 100).order_by(User.id).limit(50),
+        'admins page': db.select(User.id, User.phone).where(User.is_admin == True).order_by(User.id).limit(50),
+        'best sellers': db.select(Product.id, Product.name).order_by(
+            Product.sold_count.desc(), Product.id.desc()
+        ).limit(10),
+    }
+
+def explain(stmt):
+    """(full_scan, plan lines) for one statement on the current database"""
+    dialect = db.engine.dialect
+    sql = str(stmt.compile(dialect=dialect, compile_kwargs={'literal_binds': True}))
+    if dialect.name == 'sqlite':
+        rows = db.session.execute(db.text('EXPLAIN QUERY PLAN ' + sql)).mappings().all()
+        lines = [row['detail'] for row in rows]
+        # "SCAN t" is a full scan; "SCAN t USING [COVERING] INDEX ..." walks an index
+        full_scan = any(line.startswith('SCAN ') and ' INDEX ' not in line for line in lines)
+        return full_scan, lines
+    rows = db.session.execute(db.text('EXPLAIN ' + sql)).mappings().all()
+    lines = [
+        f"{row['table']}: type={row['type']} key={row['key']} rows={row['rows']} {row.get('Extra') or ''}"
+        for row in rows
+    ]
+    full_scan = any(row['type'] == 'ALL' for row in rows)
+    return full_scan, lines
+
+def main():
+    parser = argparse.ArgumentParser(description='Check hot queries for full table scans')
+    parser.add_argument('--verbose', '-v', action='store_true', help='Print every plan')
+    args = parser.parse_args()
+
+    app = create_app()
+    failures = 0
+    with app.app_context():
+        for name, stmt in key_queries().items():
+            full_scan, lines = explain(stmt)
+            failures += full_scan
+            print(f"{'FULL SCAN' if full_scan else 'ok':9} {name}")
+            if full_scan or args.verbose:
+                for line in lines:
+                    print(f"          {line}")
+    print(f"{failures} queries with full table scans.")
+    return 1 if failures else 0
+
+if __name__ == '__main__':
+    raise SystemExit(main())
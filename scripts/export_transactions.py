@@ -0,0 +1,31 @@
+import argparse
+import sys
+from app import create_app
+from app.controllers.ExportController import FORMATS, export_chunks
+from app.params import parse_datetime
+
+def main():
+    parser = argparse.ArgumentParser(description='Export transactions and their lines')
+    parser.add_argument('--format', choices=FORMATS, default='csv')
+    parser.add_argument('--start', help='ISO date or datetime (inclusive)')
+    parser.add_argument('--end', help='ISO date or datetime (a bare date includes that day)')
+    parser.add_argument('--status', help='Only export orders with this status')
+    parser.add_argument('--gzip', action='store_true', help='Gzip the output')
+    parser.add_argument('--output', '-o', help='Output file (default: stdout)')
+    args = parser.parse_args()
+
+    start = parse_datetime(args.start) if args.start else None
+    end = parse_datetime(args.end, is_end=True) if args.end else None
+    app = create_app()
+    with app.app_context():
+        out = open(args.output, 'wb') if args.output else sys.stdout.buffer
+        try:
+            for chunk in export_chunks(args.format, start, end, args.status, args.gzip):
+                out.write(chunk)
+        finally:
+            if args.output:
+                out.close()
+    return 0
+
+if __name__ == '__main__':
+    raise SystemExit(main())
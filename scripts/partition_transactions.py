@@ -0,0 +1,127 @@
+"""Monthly RANGE partitioning of transactions and transaction_items by created_at (MySQL only).
+
+    python -m scripts.partition_transactions init [--months-ahead 3] [--apply]
+    python -m scripts.partition_transactions extend [--months-ahead 3] [--apply]
+
+Without --apply the DDL is only printed, so it can be reviewed or run by hand.
+`init` converts the tables; `extend` splits pmax into the coming months and
+belongs in a monthly cron job.
+
+This is optional, and it has costs. MySQL does not allow foreign keys on
+partitioned tables, and every unique key must include created_at. `init`
+therefore:
+
+* drops the foreign keys of both tables;
+* widens the primary keys to (id, created_at);
+* turns the unique index on transaction_code into a plain index, leaving
+  code uniqueness to generate_transaction_code().
+
+Alembic autogenerate will then report the foreign keys as missing; leave them
+out of future migrations. With the archive job in place (see
+scripts/archive_transactions.py), partitioning mostly pays off through
+partition pruning on created_at ranges.
+"""
+import argparse
+from datetime import date, datetime
+from app import create_app, db
+
+TABLES = ('transactions', 'transaction_items')
+
+def month_start(value):
+    return date(value.year, value.month, 1)
+
+def add_months(value, months):
+    month = value.month - 1 + months
+    return date(value.year + month // 12, month % 12 + 1, 1)
+
+def partition_clauses(first, last):
+    """One partition per month in [first, last], then pmax"""
+    clauses = []
+    month = first
+    while month <= last:
+        upper = add_months(month, 1)
+        clauses.append(f"PARTITION p{month:%Y%m} VALUES LESS THAN ('{upper:%Y-%m-%d}')")
+        month = upper
+    clauses.append('PARTITION pmax VALUES LESS THAN (MAXVALUE)')
+    return clauses
+
+def existing_partitions(table):
+    return db.session.execute(db.text(
+        "SELECT PARTITION_NAME FROM information_schema.PARTITIONS"
+        " WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = :table AND PARTITION_NAME IS NOT NULL"
+    ), {'table': table}).scalars().all()
+
+def init_statements(months_ahead):
+    inspector = db.inspect(db.engine)
+    statements = []
+    for table in TABLES:
+        for fk in inspector.get_foreign_keys(table):
+            statements.append(f"ALTER TABLE {table} DROP FOREIGN KEY {fk['name']}")
+    for table in TABLES:
+        if existing_partitions(table):
+            raise SystemExit(f"{table} is already partitioned; use `extend`")
+        oldest = db.session.execute(db.text(f"SELECT MIN(created_at) FROM {table}")).scalar()
+        first = month_start(oldest or datetime.utcnow())
+        last = add_months(month_start(datetime.utcnow()), months_ahead)
+        statements.append(f"UPDATE {table} SET created_at = '1970-01-01' WHERE created_at IS NULL")
+        alter = [
+            'MODIFY created_at DATETIME NOT NULL',
+            'DROP PRIMARY KEY',
+            'ADD PRIMARY KEY (id, created_at)'
+        ]
+        # MySQL reports unique keys both as constraints and as indexes
+        uniques = {u['name']: u['column_names'] for u in inspector.get_unique_constraints(table)}
+        uniques.update((i['name'], i['column_names']) for i in inspector.get_indexes(table) if i.get('unique'))
+        for name, columns in uniques.items():
+            alter.append(f"DROP INDEX {name}")
+            alter.append(f"ADD INDEX {name} ({', '.join(columns)})")
+        statements.append(f"ALTER TABLE {table} " + ', '.join(alter))
+        statements.append(
+            f"ALTER TABLE {table} PARTITION BY RANGE COLUMNS(created_at) (\n    "
+            + ',\n    '.join(partition_clauses(first, last)) + '\n)'
+        )
+    return statements
+
+def extend_statements(months_ahead):
+    statements = []
+    for table in TABLES:
+        names = existing_partitions(table)
+        if 'pmax' not in names:
+            raise SystemExit(f"{table} is not partitioned by this script; run `init` first")
+        months = [datetime.strptime(n[1:], '%Y%m').date() for n in names if n != 'pmax']
+        first = add_months(max(months), 1) if months else month_start(datetime.utcnow())
+        last = add_months(month_start(datetime.utcnow()), months_ahead)
+        if first > last:
+            continue
+        statements.append(
+            f"ALTER TABLE {table} REORGANIZE PARTITION pmax INTO (\n    "
+            + ',\n    '.join(partition_clauses(first, last)) + '\n)'
+        )
+    return statements
+
+def main():
+    parser = argparse.ArgumentParser(description='Partition the order tables by month (MySQL)')
+    parser.add_argument('action', choices=('init', 'extend'))
+    parser.add_argument('--months-ahead', type=int, default=3, help='Create partitions up to this many months ahead')
+    parser.add_argument('--apply', action='store_true', help='Execute the DDL instead of printing it')
+    args = parser.parse_args()
+
+    app = create_app()
+    with app.app_context():
+        if db.engine.dialect.name != 'mysql':
+            parser.error(f"partitioning is MySQL only; this database is {db.engine.dialect.name}")
+        build = init_statements if args.action == 'init' else extend_statements
+        statements = build(args.months_ahead)
+        if not statements:
+            print('Nothing to do.')
+            return 0
+        for statement in statements:
+            print(statement + ';')
+            if args.apply:
+                # MySQL DDL commits implicitly; each statement stands on its own
+                with db.engine.begin() as connection:
+                    connection.execute(db.text(statement))
+    return 0
+
+if __name__ == '__main__':
+    raise SystemExit(main())
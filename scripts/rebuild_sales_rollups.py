@@ -0,0 +1,11 @@
+from app import create_app
+from app import rollups
+
+def main():
+    app = create_app()
+    with app.app_context():
+        days = rollups.rebuild()
+        print(f"Rebuilt sales rollups for {days} days.")
+
+if __name__ == '__main__':
+    main()
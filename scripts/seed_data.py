@@ -0,0 +1,258 @@
+"""Generate a synthetic dataset for load tests and benchmarks.
+
+    python -m scripts.seed_data --url sqlite:///bench.db --create-tables \\
+        --users 2000 --products 300 --orders 50000 --seed 42
+
+Output is a function of the arguments, so pass --end as well when runs on
+different days must match. The stock ledger, daily rollups and sold_count
+come out consistent with what checkout would have produced. Rows are
+appended after the current max ids; use a database whose schema matches the
+models (--create-tables builds one).
+"""
+import argparse
+import random
+from bisect import bisect
+from datetime import datetime, timedelta
+from itertools import accumulate
+from app import create_app, db, rollups
+from app.config import Config
+from app.passwords import hash_password
+from app.models.user import User
+from app.models.product import Product
+from app.models.stock import Stock
+from app.models.cart import Cart, CartItem
+from app.models.transaction import Transaction, TransactionItem
+from app.models.stock_movement import StockMovement
+from app.controllers.StockController import take_snapshots
+
+CATEGORIES = ('arabica', 'robusta', 'blend', 'equipment', 'merchandise')
+ROASTS = ('light', 'medium', 'medium-dark', 'dark')
+ORIGINS = ('Gayo', 'Toraja', 'Kintamani', 'Flores', 'Java Preanger', 'Mandailing')
+PAYMENT_METHODS = (('Bank Transfer', 60), ('E-Wallet', 30), ('COD', 10))
+STATUSES = (
+    ('completed', 55), ('shipped', 8), ('processing', 5),
+    ('paid', 10), ('pending', 14), ('cancelled', 8)
+)
+LINES_PER_ORDER = ((1, 45), (2, 25), (3, 15), (4, 10), (5, 5))
+QUANTITY = ((1, 70), (2, 20), (3, 7), (5, 3))
+
+class Weighted:
+    """Seeded weighted sampling over precomputed cumulative weights"""
+
+    def __init__(self, rng, values, weights):
+        self.rng = rng
+        self.values = list(values)
+        self.cum = list(accumulate(weights))
+
+    def pick(self):
+        return self.values[bisect(self.cum, self.rng.random() * self.cum[-1])]
+
+def zipf_weights(n, s):
+    return [1 / (rank ** s) for rank in range(1, n + 1)]
+
+def next_id(model):
+    return (db.session.query(db.func.max(model.id)).scalar() or 0) + 1
+
+def insert(model, rows, batch_size):
+    for i in range(0, len(rows), batch_size):
+        db.session.execute(db.insert(model), rows[i:i + batch_size])
+
+def seed_users(rng, count, start, password_hash, batch_size):
+    first = next_id(User)
+    rows = []
+    for n in range(count):
+        uid = first + n
+        rows.append({
+            'id': uid,
+            'username': f'seed_user_{uid}',
+            'email': f'seed_user_{uid}@example.com',
+            'password_hash': password_hash,
+            'phone': f'08{rng.randrange(10 ** 9, 10 ** 10)}',
+            'full_name': f'Seed User {uid}',
+            'address': f'Jl. Kopi No. {rng.randint(1, 300)}',
+            'city': rng.choice(ORIGINS),
+            'is_admin': n == 0,
+            'is_verified': rng.random() < 0.8,
+            'created_at': start - timedelta(days=rng.randint(1, 365)),
+            'updated_at': start
+        })
+    insert(User, rows, batch_size)
+    db.session.commit()
+    return [row['id'] for row in rows]
+
+def seed_products(rng, count, start, batch_size):
+    first = next_id(Product)
+    rows = []
+    for n in range(count):
+        category = CATEGORIES[min(int(rng.expovariate(1.2)), len(CATEGORIES) - 1)]
+        rows.append({
+            'id': first + n,
+            'name': f'{rng.choice(ORIGINS)} {category.title()} #{first + n}',
+            'description': 'Synthetic product',
+            'price': rng.randint(25, 350) * 1000,
+            'category': category,
+            'is_available': rng.random() < 0.95,
+            'roast_level': rng.choice(ROASTS) if category in ('arabica', 'robusta', 'blend') else None,
+            'origin': rng.choice(ORIGINS),
+            'created_at': start,
+            'updated_at': start
+        })
+    insert(Product, rows, batch_size)
+    db.session.commit()
+    return rows
+
+def seed_orders(rng, args, user_ids, products, start, end, first_movement_id):
+    """Insert orders in time order; returns units taken from stock per product id"""
+    # popularity rank is independent of id order
+    hot = products[:]
+    rng.shuffle(hot)
+    product_pick = Weighted(rng, hot, zipf_weights(len(hot), args.product_skew))
+    customers = user_ids[1:] or user_ids
+    user_pick = Weighted(rng, customers, zipf_weights(len(customers), args.customer_skew))
+    status_pick = Weighted(rng, *zip(*STATUSES))
+    payment_pick = Weighted(rng, *zip(*PAYMENT_METHODS))
+    lines_pick = Weighted(rng, *zip(*LINES_PER_ORDER))
+    quantity_pick = Weighted(rng, *zip(*QUANTITY))
+
+    taken = {p['id']: 0 for p in products}
+    transaction_id = next_id(Transaction)
+    item_id = next_id(TransactionItem)
+    movement_id = first_movement_id
+    span = (end - start).total_seconds()
+    offset = 0.0
+    orders, items, movements = [], [], []
+
+    def flush():
+        insert(Transaction, orders, args.batch_size)
+        insert(TransactionItem, items, args.batch_size)
+        insert(StockMovement, movements, args.batch_size)
+        db.session.commit()
+        orders.clear()
+        items.clear()
+        movements.clear()
+
+    for _ in range(args.orders):
+        # exponential gaps give an increasing, roughly uniform timeline
+        offset = min(offset + rng.expovariate(args.orders / span), span - 1)
+        created_at = start + timedelta(seconds=offset)
+        code = f"TRX-{created_at.strftime('%Y%m%d')}-{transaction_id:08d}"
+        lines = {}
+        for _ in range(lines_pick.pick()):
+            product = product_pick.pick()
+            quantity = lines.get(product['id'], (product, 0))[1] + quantity_pick.pick()
+            lines[product['id']] = (product, quantity)
+        total = 0
+        for product, quantity in lines.values():
+            subtotal = product['price'] * quantity
+            total += subtotal
+            items.append({
+                'id': item_id, 'transaction_id': transaction_id, 'product_id': product['id'],
+                'quantity': quantity, 'price': product['price'], 'subtotal': subtotal,
+                'created_at': created_at
+            })
+            # checkout takes stock for every order; cancelling does not return it
+            movements.append({
+                'id': movement_id, 'product_id': product['id'], 'delta': -quantity,
+                'reason': 'sale', 'reference_id': code, 'created_at': created_at
+            })
+            taken[product['id']] += quantity
+            item_id += 1
+            movement_id += 1
+        orders.append({
+            'id': transaction_id, 'transaction_code': code, 'user_id': user_pick.pick(),
+            'total_amount': total, 'status': status_pick.pick(),
+            'payment_method': payment_pick.pick(), 'shipping_address': 'Seed address',
+            'created_at': created_at, 'updated_at': created_at
+        })
+        transaction_id += 1
+        if len(orders) >= args.batch_size:
+            flush()
+    flush()
+    return taken
+
+def seed_stocks(rng, products, taken, start, first_movement_id, batch_size):
+    """Opening balances dated before the first order, sized to cover every sale"""
+    first = next_id(Stock)
+    stocks, movements = [], []
+    for n, product in enumerate(products):
+        opening = taken[product['id']] + rng.randint(0, 300)
+        stocks.append({
+            'id': first + n, 'product_id': product['id'],
+            'quantity': opening - taken[product['id']], 'min_stock': 10,
+            'last_restock': start, 'created_at': start, 'updated_at': start
+        })
+        movements.append({
+            'id': first_movement_id + n, 'product_id': product['id'], 'delta': opening,
+            'reason': 'initial', 'reference_id': None, 'created_at': start
+        })
+    insert(Stock, stocks, batch_size)
+    insert(StockMovement, movements, batch_size)
+    db.session.commit()
+
+def seed_carts(rng, user_ids, products, fraction, batch_size):
+    available = [p for p in products if p['is_available']] or products
+    cart_id = next_id(Cart)
+    item_id = next_id(CartItem)
+    carts, items = [], []
+    for user_id in user_ids[1:]:
+        if rng.random() >= fraction:
+            continue
+        carts.append({'id': cart_id, 'user_id': user_id})
+        for product in rng.sample(available, min(rng.randint(1, 4), len(available))):
+            items.append({
+                'id': item_id, 'cart_id': cart_id, 'product_id': product['id'],
+                'quantity': rng.randint(1, 3)
+            })
+            item_id += 1
+        cart_id += 1
+    insert(Cart, carts, batch_size)
+    insert(CartItem, items, batch_size)
+    db.session.commit()
+    return len(carts)
+
+def main():
+    parser = argparse.ArgumentParser(description='Generate a deterministic synthetic dataset')
+    parser.add_argument('--url', help='SQLAlchemy URL (default: the configured database)')
+    parser.add_argument('--create-tables', action='store_true', help='Create missing tables from the models first')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--users', type=int, default=1000)
+    parser.add_argument('--products', type=int, default=200)
+    parser.add_argument('--orders', type=int, default=20000)
+    parser.add_argument('--days', type=int, default=180, help='Spread orders over this many days')
+    parser.add_argument('--end', help='ISO date the order history ends on (default: today)')
+    parser.add_argument('--cart-fraction', type=float, default=0.3, help='Share of users with an open cart')
+    parser.add_argument('--product-skew', type=float, default=1.1, help='Zipf exponent of product popularity')
+    parser.add_argument('--customer-skew', type=float, default=0.8, help='Zipf exponent of orders per customer')
+    parser.add_argument('--password', default='password', help='Password set on every generated user')
+    parser.add_argument('--batch-size', type=int, default=5000)
+    args = parser.parse_args()
+    if args.users < 2 or args.products < 1:
+        parser.error('need at least 2 users and 1 product')
+
+    if args.url:
+        Config.SQLALCHEMY_DATABASE_URI = args.url
+        Config.SQLALCHEMY_BINDS = {}
+    end = datetime.fromisoformat(args.end) if args.end else datetime.combine(datetime.utcnow().date(), datetime.min.time())
+    end += timedelta(days=1)
+    start = end - timedelta(days=args.days)
+    rng = random.Random(args.seed)
+
+    app = create_app()
+    with app.app_context():
+        if args.create_tables:
+            db.create_all()
+        user_ids = seed_users(rng, args.users, start, hash_password(args.password), args.batch_size)
+        products = seed_products(rng, args.products, start, args.batch_size)
+        # opening-balance movements take the ids just before the sales
+        first_movement_id = next_id(StockMovement)
+        taken = seed_orders(rng, args, user_ids, products, start, end, first_movement_id + len(products))
+        seed_stocks(rng, products, taken, start, first_movement_id, args.batch_size)
+        carts = seed_carts(rng, user_ids, products, args.cart_fraction, args.batch_size)
+        days = rollups.rebuild()
+        snapshots = take_snapshots()
+        print(f"Seeded {len(user_ids)} users (admin: seed_user_{user_ids[0]}), {len(products)} products, "
+              f"{args.orders} orders, {carts} carts; {days} rollup days, {snapshots} stock snapshots.")
+    return 0
+
+if __name__ == '__main__':
+    raise SystemExit(main())
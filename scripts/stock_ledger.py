@@ -0,0 +1,28 @@
+import argparse
+from app import create_app
+from app.controllers.StockController import take_snapshots, reconcile
+
+def main():
+    parser = argparse.ArgumentParser(description='Stock ledger maintenance')
+    sub = parser.add_subparsers(dest='command', required=True)
+    snap = sub.add_parser('snapshot', help='Snapshot products with new ledger movements')
+    snap.add_argument('--min-movements', type=int, default=1,
+                      help='Only snapshot products with at least this many movements since their last snapshot')
+    sub.add_parser('reconcile', help='Verify stocks against the ledger')
+    args = parser.parse_args()
+
+    app = create_app()
+    with app.app_context():
+        if args.command == 'snapshot':
+            created = take_snapshots(args.min_movements)
+            print(f"Created {created} snapshots.")
+            return 0
+        mismatches = reconcile()
+        for row in mismatches:
+            print(f"product {row['product_id']}: stocks={row['stock_quantity']} "
+                  f"ledger={row['ledger_quantity']} diff={row['difference']:+d}")
+        print(f"{len(mismatches)} mismatched products.")
+        return 1 if mismatches else 0
+
+if __name__ == '__main__':
+    raise SystemExit(main())